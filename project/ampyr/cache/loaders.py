@@ -3,8 +3,37 @@ Defines behavior of brokering raw data into/from
 Python objects.
 """
 
+try:
+    import orjson #type: ignore[import-untyped, import-not-found]
+except ImportError: #pragma: no cover
+    orjson = None #type: ignore[assignment]
+try:
+    import ijson #type: ignore[import-untyped, import-not-found]
+except ImportError: #pragma: no cover
+    ijson = None #type: ignore[assignment]
+try:
+    import zstandard #type: ignore[import-untyped, import-not-found]
+except ImportError: #pragma: no cover
+    zstandard = None #type: ignore[assignment]
+import json
+
 from ampyr import factories as ft, protocols as pt, typedefs as td
 
+COMPRESSION_MAGIC = b"ZS1\x00"
+"""
+Prefix marking data compressed by
+`maybe_compress`.
+"""
+
+COMPRESSION_THRESHOLD = 1024
+"""
+Size in bytes above which data is compressed
+by `maybe_compress`.
+"""
+
+COMPRESSION_LEVEL = 3
+"""Level of compression used by `zstandard`."""
+
 
 class NullLoader(pt.SupportsSerialize[td.GT]):
     """
@@ -13,11 +42,31 @@ class NullLoader(pt.SupportsSerialize[td.GT]):
     wanted.
     """
 
-    def loads(self, data, *args, **kwds):
-        return data
+    def loads(self, data: td.StrOrBytes, *args, **kwds) -> td.GT:
+        return data #type: ignore[return-value]
 
-    def dumps(self, data, *args, **kwds):
-        return data
+    def dumps(self, data: td.GT, *args, **kwds) -> td.StrOrBytes:
+        return data #type: ignore[return-value]
+
+
+class JSONLoader(pt.SupportsSerialize[td.GT]):
+    """
+    Transforms data to/from JSON. Uses `orjson`
+    if it is available, otherwise falls back on
+    the standard `json` module.
+
+    Data is dumped as UTF-8 encoded bytes.
+    """
+
+    def loads(self, data: td.StrOrBytes, *args, **kwds) -> td.GT:
+        if orjson:
+            return orjson.loads(data)
+        return json.loads(data, *args, **kwds)
+
+    def dumps(self, data: td.GT, *args, **kwds) -> td.StrOrBytes:
+        if orjson:
+            return orjson.dumps(data)
+        return json.dumps(data, *args, **kwds).encode()
 
 
 def load(serializer: pt.SupportsSerialize[td.GT], data: td.StrOrBytes, *,
@@ -29,8 +78,8 @@ def load(serializer: pt.SupportsSerialize[td.GT], data: td.StrOrBytes, *,
     manipulation of the data/object.
     """
 
-    if not factory:
-        factory = ft.basic_passthrough_ft
+    if factory is None:
+        return serializer.loads(data)
     return factory(serializer.loads(data)) #type: ignore[type-var]
 
 
@@ -44,6 +93,96 @@ def dump(serializer: pt.SupportsSerialize[td.GT], obj: td.GT, *,
     deconstruction of the given data/object.
     """
 
-    if not factory:
-        factory = ft.basic_passthrough_ft
+    if factory is None:
+        return serializer.dumps(obj)
     return serializer.dumps(factory(obj))
+
+
+def load_stream(serializer: pt.SupportsSerialize[td.GT], stream: td.BinaryIO,
+    *, factory: ft.OptGenericFT[td.GT] = None) -> td.GT:
+    """
+    Loads raw data from the given `stream` using
+    some `serializer`.
+
+    If the serializer is a `JSONLoader` and
+    `ijson` is available, the stream is parsed
+    incrementally rather than read whole.
+    """
+
+    if not ijson or not isinstance(serializer, JSONLoader):
+        return load(serializer, stream.read(), factory=factory)
+
+    found = next(ijson.items(stream, "", use_float=True))
+    if factory is None:
+        return found
+    return factory(found)
+
+
+def maybe_compress(data: td.StrOrBytes) -> td.StrOrBytes:
+    """
+    Compresses the given `data` if it is a byte
+    array larger than `COMPRESSION_THRESHOLD`
+    and `zstandard` is available. Compressed
+    data is prefixed with `COMPRESSION_MAGIC`.
+    """
+
+    if not zstandard or not isinstance(data, bytes):
+        return data
+    if len(data) <= COMPRESSION_THRESHOLD:
+        return data
+
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    return COMPRESSION_MAGIC + compressor.compress(data)
+
+
+def is_compressed(data: td.StrOrBytes) -> bool:
+    """
+    Whether the given `data` was compressed by
+    `maybe_compress`.
+    """
+
+    return isinstance(data, bytes) and data.startswith(COMPRESSION_MAGIC)
+
+
+def decompressed_size(data: bytes) -> int:
+    """
+    Size in bytes of the given compressed `data`
+    once decompressed. Returns -1 if the size is
+    unknown.
+    """
+
+    if not zstandard:
+        return -1
+    return zstandard.frame_content_size(data[len(COMPRESSION_MAGIC):])
+
+
+def open_decompressed(stream: td.BinaryIO) -> td.Optional[td.BinaryIO]:
+    """
+    Wraps a `stream` positioned at data
+    compressed by `maybe_compress` so that reads
+    return decompressed data. Returns `None` if
+    `zstandard` is not available.
+    """
+
+    if not zstandard:
+        return None
+
+    stream.read(len(COMPRESSION_MAGIC))
+    return zstandard.ZstdDecompressor().stream_reader(stream)
+
+
+def maybe_decompress(data: td.StrOrBytes) -> td.Optional[td.StrOrBytes]:
+    """
+    Decompresses the given `data` if it was
+    compressed by `maybe_compress`. Returns
+    `None` if the data is compressed but
+    `zstandard` is not available.
+    """
+
+    if not isinstance(data, bytes) or not data.startswith(COMPRESSION_MAGIC):
+        return data
+    if not zstandard:
+        return None
+
+    decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data[len(COMPRESSION_MAGIC):])
@@ -4,7 +4,7 @@ classes as handlers for brokering data to/from
 some cache.
 """
 
-import json, os, shelve
+import collections, functools, io, os, sqlite3, stat, threading, time
 
 from ampyr import protocols as pt, typedefs as td
 from ampyr.cache import loaders, tools
@@ -18,6 +18,21 @@ class SimpleCacheManager(pt.CacheManager[td.GT]):
     WARNING: not meant to be used directly!
     """
 
+    __slots__ = ("serializer", "sub_ids", "_load", "_dump", "_passthrough")
+
+    __serializer_class__: type[pt.SupportsSerialize] = loaders.NullLoader
+    """
+    Class used to build the `serializer` when
+    none is given at construction.
+    """
+
+    __serializer__: td.Optional[pt.SupportsSerialize] = None
+    """
+    Default `serializer` set at the class level
+    of a subclass. Used in place of
+    `__serializer_class__` if defined.
+    """
+
     serializer: pt.SupportsSerialize[td.GT]
     """
     An object which can transform data to/from a
@@ -31,17 +46,51 @@ class SimpleCacheManager(pt.CacheManager[td.GT]):
     with this `CacheManager`.
     """
 
+    _load: td.Callable[[td.StrOrBytes], td.GT]
+    _dump: td.Callable[[td.GT], td.StrOrBytes]
+
+    _passthrough: bool
+    """
+    Whether data can be stored as is, skipping
+    the `serializer`. True when the serializer
+    is a `NullLoader`.
+    """
+
+    def __init_subclass__(cls, **kwds) -> None:
+        """
+        Construct this type of `CacheManager`.
+        """
+
+        super().__init_subclass__(**kwds)
+
+        # A class-level `serializer` shadows the
+        # slot of the same name. Keep it as the
+        # default and restore the slot.
+        if "serializer" in vars(cls):
+            cls.__serializer__ = vars(cls)["serializer"]
+            delattr(cls, "serializer")
+
     def __init__(self, *,
         serializer: td.Optional[pt.SupportsSerialize] = None,
         sub_ids: td.Optional[tuple[td.StrOrBytes, ...]] = None):
         """Construct a new `CacheManager`."""
 
-        self.serializer = (
-            serializer
-            or getattr(self, "serializer", None)
-            or loaders.NullLoader())
+        if serializer is None:
+            serializer = self.__serializer__
+        if serializer is None:
+            serializer = self.__serializer_class__()
+        self.serializer = serializer
+
+        self.sub_ids = () if sub_ids is None else sub_ids
 
-        self.sub_ids    = sub_ids or ()
+        # Bind serializer methods once so lookups
+        # are not repeated per `find`/`save`.
+        # NOTE: reassigning `serializer` after
+        # construction will not update these.
+        self._load = self.serializer.loads
+        self._dump = self.serializer.dumps
+
+        self._passthrough = isinstance(self.serializer, loaders.NullLoader)
 
 
 class NullCacheManager(SimpleCacheManager[None]):
@@ -50,6 +99,8 @@ class NullCacheManager(SimpleCacheManager[None]):
     Used as a dummy value.
     """
 
+    __slots__ = ()
+
     def find(self, key: str):
         return None
 
@@ -60,29 +111,108 @@ class NullCacheManager(SimpleCacheManager[None]):
 class MemoryCacheManager(SimpleCacheManager[td.GT]):
     """
     Cache manager which stores it's inputs in
-    memory during runtime.
+    memory during runtime. Records are evicted
+    least recently used first once `capacity` is
+    exceeded, or once they are older than `ttl`
+    seconds if one is set.
+    """
+
+    __slots__ = ("stored_data", "_capacity", "_ttl", "_expires_at")
+
+    stored_data: collections.OrderedDict[str, td.StrOrBytes | td.GT]
+    """
+    Records stored by this manager. Ordered from
+    least to most recently used.
+    """
+
+    capacity: int = 1024
+    """
+    Maximum number of records held before
+    eviction.
+    """
+
+    lazy: bool = False
+    """
+    Whether to store objects as is, skipping the
+    `serializer` on `save` and `find`. Records
+    are then shared with the caller rather than
+    copied.
     """
 
-    stored_data: dict[str, td.StrOrBytes] = dict()
+    ttl: td.Optional[float] = None
+    """
+    Time in seconds records live after being
+    saved. Records never expire if `None`.
+    """
 
     def find(self, key: str):
         found = self.stored_data.get(key, None)
-        if not found:
+        if found is None:
+            return None
+
+        if self._ttl is not None and self._expires_at[key] <= time.monotonic():
+            self.stored_data.pop(key, None)
+            self._expires_at.pop(key, None)
             return None
-        return loaders.load(self.serializer, found)
+
+        self.stored_data.move_to_end(key)
+        if self._passthrough:
+            return found
+        # Records are always serialized unless
+        # stored in passthrough mode.
+        return self._load(found) #type: ignore[arg-type]
 
     def save(self, key: str, data: td.GT):
-        dump = loaders.dump(self.serializer, data)
+        dump = data if self._passthrough else self._dump(data)
         self.stored_data[key] = dump
+        self.stored_data.move_to_end(key)
+        if self._ttl is not None:
+            self._expires_at[key] = time.monotonic() + self._ttl
+
+        # Evict least recently used records
+        # until within capacity.
+        while len(self.stored_data) > self._capacity:
+            evicted, _ = self.stored_data.popitem(last=False)
+            self._expires_at.pop(evicted, None)
         return data
 
+    def __init__(self, *,
+        capacity: td.Optional[int] = None,
+        lazy: td.Optional[bool] = None,
+        ttl: td.Optional[float] = None,
+        serializer: td.Optional[pt.SupportsSerialize] = None,
+        sub_ids: td.Optional[tuple[td.StrOrBytes, ...]] = None):
+
+        super().__init__(
+            serializer=serializer,
+            sub_ids=sub_ids)
+        if lazy is None:
+            lazy = self.lazy
+        if lazy:
+            self._passthrough = True
+        self._capacity   = self.capacity if capacity is None else capacity
+        self._ttl        = self.ttl if ttl is None else ttl
+        self._expires_at: dict[str, float] = {}
+        self.stored_data = collections.OrderedDict()
+
 
 class LocalDataCacheManager(SimpleCacheManager[td.GT]):
     """Stores data locally on disc."""
 
+    __slots__ = ("data_location", "_fileexists_cache")
+
     data_location: td.FilePath
     """Path to where data is stored."""
 
+    fileexists_ttl: float = 1.0
+    """
+    Amount of time in seconds the result of
+    `fileexists` is reused before checking the
+    disc again.
+    """
+
+    _fileexists_cache: td.Optional[tuple[float, bool]]
+
     @property
     def fileexists(self):
         """
@@ -91,9 +221,32 @@ class LocalDataCacheManager(SimpleCacheManager[td.GT]):
         file.
         """
 
-        path = self.data_location
-        return os.path.exists(path) and os.path.isfile(path)
+        now, cached = time.monotonic(), self._fileexists_cache
+        if cached and (now - cached[0]) < self.fileexists_ttl:
+            return cached[1]
+
+        exists = self._check_fileexists()
+        self._fileexists_cache = (now, exists)
+        return exists
+
+    def _check_fileexists(self):
+        """
+        Checks the disc for the file at
+        `data_location`.
+        """
+
+        try:
+            return stat.S_ISREG(os.stat(self.data_location).st_mode)
+        except OSError:
+            return False
 
+    def _set_fileexists(self):
+        """
+        Marks the file at `data_location` as
+        existing. Call after writing to it.
+        """
+
+        self._fileexists_cache = (time.monotonic(), True)
 
     def __init__(self, *,
         data_location: td.OptFilePath = None,
@@ -105,6 +258,8 @@ class LocalDataCacheManager(SimpleCacheManager[td.GT]):
             sub_ids=sub_ids)
         self.data_location = tools.get_cache_path(data_location)
 
+        self._fileexists_cache = None
+
 
 class FileCacheManager(LocalDataCacheManager[td.GT]):
     """
@@ -115,94 +270,314 @@ class FileCacheManager(LocalDataCacheManager[td.GT]):
     serve single record use.
     """
 
-    serializer: pt.SupportsSerialize[td.GT] = json
+    __slots__ = ("_build", "_split")
+
+    __serializer_class__ = loaders.JSONLoader
 
-    join_char: str = ":"
+    join_char: td.StrOrBytes = ":"
     """
     Character used to join keys to corresponding
     data.
     """
 
+    streaming_threshold: int = 64 * 1024
+    """
+    Size in bytes above which records are parsed
+    as a stream instead of read whole. Compared
+    against the decompressed size of compressed
+    records.
+    """
+
     def find(self, key: str):
         # Avoid catastrophie and skip if no file
         # exists yet.
         if not self.fileexists:
             return None
 
-        with open(self.data_location, "r") as fd:
-            fkey, found = tools.split_keypair(self.join_char, fd.read())
+        # The file may have been removed since it
+        # was last seen.
+        try:
+            fd = open(self.data_location, "rb")
+        except OSError:
+            self._fileexists_cache = None
+            return None
+
+        with fd:
+            if os.fstat(fd.fileno()).st_size > self.streaming_threshold:
+                return self._find_streamed(fd, key)
+
+            fkey, found = self._split(fd.read())
 
             # If the key associated with the file
             # data does not match the given key,
             # bail.
-            if fkey != key:
+            if fkey != key.encode(tools.DEFAULT_ENCODING):
                 return None
-            return loaders.load(self.serializer, found)
+
+            # Compressed records may still be large
+            # once decompressed.
+            if (loaders.is_compressed(found)
+                and loaders.decompressed_size(found) > self.streaming_threshold):
+                return self._load_streamed(io.BytesIO(found), compressed=True)
+
+            found = loaders.maybe_decompress(found)
+            if found is None:
+                return None
+            return self._load(found)
+
+    def _find_streamed(self, fd: io.BufferedReader, key: str):
+        """
+        Load data from a large cache file without
+        reading it whole into memory.
+        """
+
+        # Only the head of the file is needed to
+        # compare against the given key.
+        expected = self._build(key.encode(tools.DEFAULT_ENCODING), b"")
+        if fd.read(len(expected)) != expected:
+            return None
+
+        magic = loaders.COMPRESSION_MAGIC
+        compressed = fd.peek(len(magic))[:len(magic)] == magic
+        return self._load_streamed(fd, compressed=compressed)
+
+    def _load_streamed(self, stream: td.BinaryIO, *, compressed: bool):
+        """
+        Parse the record at the current position
+        of `stream` incrementally. Compressed
+        records are decompressed as they are read.
+        """
+
+        if compressed:
+            found = loaders.open_decompressed(stream)
+            if found is None:
+                return None
+            stream = found
+        return loaders.load_stream(self.serializer, stream)
 
     def save(self, key: str, data: td.GT):
-        with open(self.data_location, "w") as fd:
+        with open(self.data_location, "wb") as fd:
             # Ensures given data is written as a
-            # string.
-            dump = str(loaders.dump(self.serializer, data))
-            fd.write(tools.build_keypair(self.join_char, key, dump))
+            # byte array.
+            dump = self._dump(data)
+            if not isinstance(dump, bytes):
+                dump = str(dump).encode(tools.DEFAULT_ENCODING)
+            dump = loaders.maybe_compress(dump)
+
+            fd.write(self._build(key.encode(tools.DEFAULT_ENCODING), dump))
+        self._set_fileexists()
+        return data
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
 
+        # Cache files are handled as bytes; encode
+        # a `str` join character once up front.
+        join_char = self.join_char
+        if isinstance(join_char, str):
+            join_char = join_char.encode(tools.DEFAULT_ENCODING)
 
-def _open_shelf(filepath: str) -> shelve.Shelf[td.StrOrBytes]:
+        # Use the specialized keypair functions
+        # for the default `join_char`.
+        if join_char == b":":
+            self._build = tools.build_colon_keypair
+            self._split = tools.split_colon_keypair
+        else:
+            self._build = functools.partial(tools.build_keypair, join_char)
+            self._split = functools.partial(tools.split_keypair, join_char)
+
+
+SQLITE_MAX_VARIABLES = 999
+"""
+Maximum number of keys bound to a single
+`find_many` query. Older `sqlite3` builds limit
+a statement to 999 parameters.
+"""
+
+
+def _open_kv(filepath: str, *, synchronous: str = "NORMAL"):
     """
-    Open's a shelf in context.
+    Open's a key/value store backed by `sqlite3`.
+    The connection may be used from threads
+    other than the one that opened it.
     NOTE: Must close manually.
     """
 
-    return shelve.open(filepath) #type: ignore[return-value]
+    conn = sqlite3.connect(
+        filepath, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS kv(k TEXT PRIMARY KEY, v BLOB) "
+        "WITHOUT ROWID")
+
+    return conn
 
 
 class ShelfCacheManager(LocalDataCacheManager[td.GT]):
     """
-    Stores data on disc locally as a series of
-    shelves using the `shelve` module.
+    Stores data on disc locally as a key/value
+    table using the `sqlite3` module.
+
+    The store is opened once on first use and
+    held until `close` is called. Access to the
+    store is serialized between threads.
     """
 
-    # Override this method. `shelve` module
-    # creates multiple files for data store.
-    @property
-    def fileexists(self):
-        path = self.data_location
+    __slots__ = ("_db", "_db_lock")
 
-        # If is single file db instance.
-        temp_path = ".".join([path, "db"])
-        if os.path.exists(temp_path):
-            return True
+    __serializer_class__ = loaders.JSONLoader
 
-        # shelve module generates multiple files.
-        for ext in ("dat", "dir", "bak"):
-            temp_path = ".".join([path, ext])
+    file_extension: str = "sqlite3"
+    """
+    Extension appended to `data_location` for
+    the database file.
+    """
 
-            # If required file doesn't exist,
-            # bail.
-            if not os.path.exists(temp_path):
-                return False
+    sync_on_save: bool = False
+    """
+    Whether or not to fully flush the store to
+    disc after each call to `save`.
+    """
 
-            # If required target is not a file,
-            # bail.
-            if not os.path.isfile(temp_path):
-                return False
+    _db: td.Optional[sqlite3.Connection]
+    _db_lock: threading.Lock
+
+    @property
+    def db_location(self):
+        """Path to the database file."""
 
-        return True
+        return ".".join([str(self.data_location), self.file_extension])
+
+    # Override this method. The database lives
+    # in its own file.
+    def _check_fileexists(self):
+        try:
+            return stat.S_ISREG(os.stat(self.db_location).st_mode)
+        except OSError:
+            return False
 
     def find(self, key: str):
-        if not self.fileexists:
+        if self._db is None and not self.fileexists:
             return None
 
-        with _open_shelf(str(self.data_location)) as db:
-            found = db.get(key, None)
-            db.close()
-
+        with self._db_lock:
+            found = self._db_handle().execute(
+                "SELECT v FROM kv WHERE k=?", (key,)).fetchone()
         if not found:
             return None
-        return loaders.load(self.serializer, found)
+
+        found = loaders.maybe_decompress(found[0])
+        if found is None:
+            return None
+        return self._load(found)
 
     def save(self, key: str, data: td.GT):
-        with _open_shelf(str(self.data_location)) as db:
-            db[key] = loaders.dump(self.serializer, data)
-            db.close()
+        blob = self._to_blob(data)
+        with self._db_lock:
+            self._db_handle().execute(
+                "INSERT OR REPLACE INTO kv VALUES(?,?)", (key, blob))
+        self._set_fileexists()
         return data
+
+    def find_many(self, keys: td.Iterable[str]):
+        keys = list(keys)
+        found = dict.fromkeys(keys)
+
+        if not keys or (self._db is None and not self.fileexists):
+            return found
+
+        # Query in chunks to stay within the
+        # parameter limit of `sqlite3`.
+        rows = []
+        with self._db_lock:
+            db = self._db_handle()
+            for idx in range(0, len(keys), SQLITE_MAX_VARIABLES):
+                chunk = keys[idx:idx + SQLITE_MAX_VARIABLES]
+                query = "SELECT k, v FROM kv WHERE k IN ({})".format(
+                    ",".join("?" * len(chunk)))
+                rows.extend(db.execute(query, chunk))
+
+        for key, value in rows:
+            value = loaders.maybe_decompress(value)
+            if value is not None:
+                found[key] = self._load(value)
+        return found
+
+    def save_many(self, items: td.Mapping[str, td.GT]):
+        rows = [(k, self._to_blob(v)) for k, v in items.items()]
+
+        # Write all items in one transaction. No
+        # other call may use the connection until
+        # it ends.
+        with self._db_lock:
+            db = self._db_handle()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany("INSERT OR REPLACE INTO kv VALUES(?,?)", rows)
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+        self._set_fileexists()
+        return items
+
+    def close(self):
+        """
+        Closes the store held by this manager, if
+        any is open.
+        """
+
+        # May be called before construction has
+        # finished from `__del__`.
+        if getattr(self, "_db", None) is None:
+            return
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _to_blob(self, data: td.GT):
+        """
+        Serializes the given data into a byte
+        array that can be stored in the table.
+        """
+
+        dump = self._dump(data)
+        if isinstance(dump, str):
+            dump = dump.encode(tools.DEFAULT_ENCODING)
+        elif not isinstance(dump, bytes):
+            raise TypeError(
+                f"{type(self.serializer).__name__} produced "
+                f"{type(dump).__name__}; expected str or bytes.")
+        return loaders.maybe_compress(dump)
+
+    def _db_handle(self):
+        """
+        Returns the store held by this manager.
+        Opens a new store if none is open yet.
+        Expects `_db_lock` to be held.
+        """
+
+        if self._db is None:
+            self._db = _open_kv(
+                self.db_location,
+                synchronous=("FULL" if self.sync_on_save else "NORMAL"))
+        return self._db
+
+    def __init__(self, **kwds):
+        super().__init__(**kwds)
+        self._db      = None
+        self._db_lock = threading.Lock()
+
+        # Records are stored as raw bytes. Objects
+        # cannot be passed through as is.
+        if self._passthrough:
+            raise ValueError(
+                f"{type(self).__name__} requires a serializer that "
+                "produces str or bytes; got "
+                f"{type(self.serializer).__name__}.")
+
+    def __del__(self):
+        self.close()
@@ -1,3 +1,5 @@
+import functools, os, typing
+
 from ampyr import errors, protocols as pt, typedefs as td
 
 DEFAULT_CACHE_PATH = ".cache"
@@ -5,57 +7,126 @@ DEFAULT_CACHE_PATH = ".cache"
 Default filename used for local cache files.
 """
 
+DEFAULT_ENCODING = "utf-8"
+"""
+Encoding used when writing string data to local
+cache files.
+"""
+
 
 def get_cache_path(path: td.OptFilePath = None,
-    *ids: str | None) -> td.FilePath:
+    ids: tuple[str | None, ...] = ()) -> td.FilePath:
     """
     Retrieve the path for some cache file used
     for long-term storage.
+
+    `path` is normalized to its filesystem
+    representation before lookup so any
+    path-like object may be given.
+    """
+
+    return _get_cache_path(None if path is None else os.fspath(path), ids)
+
+
+@functools.lru_cache(maxsize=128)
+def _get_cache_path(path: str | bytes | None,
+    ids: tuple[str | None, ...]) -> td.FilePath:
+    """
+    Memoized implementation of
+    `get_cache_path`.
     """
 
-    if not path:
+    if path is None:
         path = DEFAULT_CACHE_PATH
 
     # Filter out any undefined or null values.
     # Join the remaining to the filepath.
-    ids = tuple(filter(lambda i: i != None, ids))
-    if len(ids):
-        path = "-".join([str(path), *ids]) #type: ignore[list-item]
+    found = [i for i in ids if i is not None]
+    if found:
+        path = "-".join([str(path), *found])
 
     return path
 
 
-def get_generic_key(obj: pt.HasCacheHandler, *ids):
+def get_generic_key(obj: pt.HasCacheHandler, ids: tuple = ()) -> str:
     """
     Constructs a string that can be used as a
     search key for any relevant cache data.
     """
 
-    typename, baseids = type(obj).__name__, []
+    baseids = tuple(
+        i.__name__ if hasattr(i, "__name__") else "('{}')".format(i)
+        for i in ids)
+
+    return _make_generic_key(type(obj).__name__, baseids)
+
 
-    for i in ids:
-        if hasattr(i, "__name__"):
-            baseids.append(i.__name__)
-            continue
-        baseids.append("('{}')".format(i))
+@functools.lru_cache(maxsize=256)
+def _make_generic_key(typename: str, baseids: tuple[str, ...]) -> str:
+    """
+    Renders the search key from the given type
+    name and normalized ids.
+    """
 
     return "<{}={}>".format(typename, "-".join(baseids))
 
 
-def build_keypair(join_char: str, key: str, data: str):
+@typing.overload
+def build_keypair(join_char: str, key: str, data: str) -> str:
+    ...
+
+
+@typing.overload
+def build_keypair(join_char: bytes, key: bytes, data: bytes) -> bytes:
+    ...
+
+
+def build_keypair(join_char: td.StrOrBytes, key: td.StrOrBytes,
+    data: td.StrOrBytes) -> td.StrOrBytes:
     """
     Renders the concatenation of some search key
-    and the data related to it.
+    and the data related to it. Values given
+    must be all strings or all byte arrays.
     """
 
-    return join_char.join([key, data])
+    return join_char.join([key, data]) #type: ignore[list-item]
+
+
+@typing.overload
+def split_keypair(join_char: str, keypair: str) -> list[str]:
+    ...
 
 
-def split_keypair(join_char: str, keypair: str):
+@typing.overload
+def split_keypair(join_char: bytes, keypair: bytes) -> list[bytes]:
+    ...
+
+
+def split_keypair(join_char: td.StrOrBytes,
+    keypair: td.StrOrBytes) -> list[str] | list[bytes]:
     """
     From the given `join_char`, divide a
     `keypair` string into its individual
     components.
     """
 
-    return keypair.split(join_char, maxsplit=1)
+    return keypair.split(join_char, maxsplit=1) #type: ignore[arg-type]
+
+
+def build_colon_keypair(key: bytes, data: bytes) -> bytes:
+    """
+    Specialization of `build_keypair` for byte
+    arrays joined by a colon.
+    """
+
+    return b":".join((key, data))
+
+
+def split_colon_keypair(keypair: bytes) -> tuple[bytes, bytes]:
+    """
+    Specialization of `split_keypair` for byte
+    arrays joined by a colon.
+    """
+
+    key, _, data = keypair.partition(b":")
+    return key, data
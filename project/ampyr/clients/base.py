@@ -14,6 +14,15 @@ class SimpleRESTClient(pt.RESTClient):
     of this and derivitive types.
     """
 
+    __slots__ = (
+        "driver",
+        "oauth2flow",
+        "__auth_config__",
+        "__url_config__",
+        "__oauth_class__",
+        "__driver_factory__",
+        "__oauth_factory__")
+
     driver: pt.RESTDriver
     """
     Internal functionality for handling REST
@@ -111,18 +120,25 @@ class SimpleRESTClient(pt.RESTClient):
         URL values.
         """
 
-        if not kwds["url_for_oauth"]:
+        if kwds["url_for_oauth"] is None:
             kwds["url_for_oauth"] = url_for_host
 
-        if not kwds["endpoint_for_oauth"]:
+        if kwds["endpoint_for_oauth"] is None:
             kwds["endpoint_for_oauth"] = "authorize"
 
         # What's the smarter way to handle this?
-        if not kwds["endpoint_for_token"]:
+        if kwds["endpoint_for_token"] is None:
             kwds["endpoint_for_token"] = "api/token"
 
         kwds["url_for_host"] = url_for_host
 
+        # Join URLs once here rather than each
+        # time an `OAuth2Flow` is built.
+        kwds["joined_oauth_url"] = \
+            f"{kwds['url_for_oauth']}/{kwds['endpoint_for_oauth']}"
+        kwds["joined_token_url"] = \
+            f"{kwds['url_for_oauth']}/{kwds['endpoint_for_token']}"
+
         inst = ft.generic_make(
             configs.UrlConfig,
             gt_kwds=kwds,
@@ -143,16 +159,8 @@ class SimpleRESTClient(pt.RESTClient):
 
         gt_kwds = {}
 
-        # Parse oauth string
-        gt_kwds["url_for_oauth"] = "/".join([
-            self.url_config.url_for_oauth,
-            self.url_config.endpoint_for_oauth])
-
-        # Parse token string
-        gt_kwds["url_for_token"] = "/".join([
-            self.url_config.url_for_oauth,
-            self.url_config.endpoint_for_token])
-
+        gt_kwds["url_for_oauth"]    = self.url_config.joined_oauth_url
+        gt_kwds["url_for_token"]    = self.url_config.joined_token_url
         gt_kwds["client_userid"]    = self.auth_config.client_userid
         gt_kwds["url_for_redirect"] = self.url_config.url_for_redirect
 
@@ -5,14 +5,16 @@ import dataclasses
 from ampyr import protocols as pt, typedefs as td
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class SimpleConfig(pt.MetaConfig):
 
     def asdict(self):
-        return dataclasses.asdict(self)
+        # Fields are flat; skip the recursive
+        # copying done by `dataclasses.asdict`.
+        return {f: getattr(self, f) for f in self.__dataclass_fields__}
 
 
-@dataclasses.dataclass(slots=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class AuthConfig(SimpleConfig):
     """
     Config values specific to authentication
@@ -26,7 +28,7 @@ class AuthConfig(SimpleConfig):
     client_userid: td.OptString = None
 
 
-@dataclasses.dataclass(slots=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class UrlConfig(SimpleConfig):
     """
     Config values specific to URLs used in the
@@ -39,5 +41,9 @@ class UrlConfig(SimpleConfig):
     endpoint_for_oauth: str
     endpoint_for_token: str
 
+    # Precomputed from the above.
+    joined_oauth_url: str
+    joined_token_url: str
+
     # Optionals.
     url_for_redirect: td.OptString = None
@@ -12,6 +12,8 @@ class SimpleRESTDriver(pt.RESTDriver):
     of this and derivitive types.
     """
 
+    __slots__ = ()
+
 
 class NullRESTDriver(SimpleRESTDriver):
     """
@@ -22,6 +24,8 @@ class NullRESTDriver(SimpleRESTDriver):
     and/or return nothing.
     """
 
+    __slots__ = ()
+
     def make_payload(self, data: td.OptRequestHeaders = None):
         if not data:
             return td.RequestHeaders()
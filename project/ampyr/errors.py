@@ -6,6 +6,12 @@ package.
 import http
 from typing import Optional
 
+HTTP_STATUSES = {int(s): s for s in http.HTTPStatus}
+"""
+Mapping of integer status codes to their
+`http.HTTPStatus` members.
+"""
+
 
 class SpotifyException(Exception):
     """
@@ -20,18 +26,19 @@ class SpotifyHttpError(SpotifyException):
     errors from the `Spotify Web API`.
     """
 
-    status: http.HTTPStatus = http.HTTPStatus(500)
+    status: int | http.HTTPStatus = http.HTTPStatus(500)
     """Response code from `Spotify Web API`."""
 
-    def __init__(self, *values, status: Optional[http.HTTPStatus] = None):
+    def __init__(self, *values, status: Optional[int | http.HTTPStatus] = None):
         super().__init__(self, *values)
 
-        # Custom http attributes.
+        # Custom http attributes. Known codes are
+        # resolved without calling the enum.
         if status:
-            self.status = status
+            self.status = HTTP_STATUSES.get(status, status)
 
     def __str__(self):
-        return "{}: {}".format(self.status.value, super().__str__())
+        return "{}: {}".format(int(self.status), super().__str__())
 
 
 class SpotifyUnauthorizedError(SpotifyHttpError):
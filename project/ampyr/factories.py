@@ -4,12 +4,13 @@ used in this package.
 """
 
 import functools
-from typing import Any, Callable, Optional
-
-import requests
+from typing import Any, Callable, Optional, TYPE_CHECKING
 
 from ampyr import  protocols as pt, typedefs as td
 
+if TYPE_CHECKING:
+    import requests
+
 GenericFT = Callable[[td.GT], td.GT]
 """Generic factory."""
 
@@ -26,15 +27,15 @@ OptInstanceFT = Optional[InstanceFT]
 """Optional `InstanceFT`."""
 
 
-def basic_constructor_ft(cls: type[td.GT], *args, **kwds):
+def basic_constructor_ft(cls: type[td.GT], *args, **kwds) -> td.GT:
     return cls(*args, **kwds)
 
 
-def basic_executor_ft(func: Callable, *args, **kwds):
+def basic_executor_ft(func: Callable, *args, **kwds) -> Any:
     return func(*args, **kwds)
 
 
-def basic_passthrough_ft(obj: td.GT, *args, **kwds):
+def basic_passthrough_ft(obj: td.GT, *args, **kwds) -> td.GT:
     return obj
 
 
@@ -59,7 +60,7 @@ def generic_make(
     return factory(gt_cls, *args, **kwds)
 
 
-def compose(*functions: Callable[[td.GT | Any], Any]):
+def compose(*functions: Callable[[td.GT | Any], Any]) -> Any:
     """
     Defines a new callable which accepts a
     series of functions as its procedure
@@ -77,7 +78,7 @@ Factory which constructs a `CacheManager` object.
 OptCacheFT = Optional[CacheFT]
 """Optional `CacheFactory`."""
 
-SessionFT = Callable[[type[requests.Session]], requests.Session]
+SessionFT = Callable[[type["requests.Session"]], "requests.Session"]
 """
 Factory which constructs a `requests.Session`
 object.
@@ -1,2 +1,2 @@
 from ampyr.oauth2.flows import CredentialsFlow, AuthorizationFlow, PKCEFlow, \
-    NullFlow
+    NullFlow, aquire_many
@@ -1,5 +1,11 @@
 """Base `OAuth2Flow` definition."""
 
+import collections, threading
+
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
 from ampyr import factories as ft, protocols as pt, typedefs as td
 from ampyr import cache
 from ampyr.oauth2 import configs, tokens
@@ -10,12 +16,62 @@ Default base url for making making calls to some
 `OAuth2.0` server.
 """
 
-DEFAULT_TOKEN_URL = "/".join([DEFAULT_OAUTH_URL, "token"])
+DEFAULT_TOKEN_URL = f"{DEFAULT_OAUTH_URL}/token"
 """
 Default base url for making token requests to
 some `OAuth2.0` server.
 """
 
+SESSION_POOL_CONNECTIONS = 10
+"""
+Number of connection pools cached by the shared
+`requests.Session`.
+"""
+
+SESSION_POOL_MAXSIZE = 50
+"""
+Maximum number of connections kept per pool by
+the shared `requests.Session`.
+"""
+
+
+def _make_shared_session():
+    """
+    Creates a `requests.Session` with pooled,
+    keep-alive connections. Shared by all flows
+    not given a `session_factory`.
+    """
+
+    session = td.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=SESSION_POOL_CONNECTIONS,
+        pool_maxsize=SESSION_POOL_MAXSIZE,
+        max_retries=Retry(total=3, backoff_factor=0.2)))
+
+    return session
+
+
+SHARED_SESSION = _make_shared_session()
+"""
+Session used by flows that do not build their
+own. Must not be closed by any one flow.
+"""
+
+CACHE_REGISTRY_SIZE = 256
+"""
+Maximum number of shared `CacheManager` objects
+held. The least recently used are dropped first.
+"""
+
+_CACHE_REGISTRY: collections.OrderedDict[
+    tuple[str, td.OptString, str], pt.CacheManager] = collections.OrderedDict()
+"""
+Default `CacheManager` objects shared between
+flows, keyed by client credentials, user id and
+normalized scope.
+"""
+_CACHE_REGISTRY_LOCK = threading.Lock()
+
 
 class SimpleOAuth2Flow(pt.OAuth2Flow):
     """
@@ -25,6 +81,18 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
     Warning: Not meant to be used directly.
     """
 
+    __slots__ = (
+        "cache_manager",
+        "cache_class",
+        "cache_factory",
+        "session",
+        "session_factory",
+        "url_for_oauth",
+        "url_for_token",
+        "__auth_config__",
+        "__requests_config__",
+        "_normalized_scope")
+
     cache_manager: pt.CacheManager[td.TokenMetaData]
     """
     Interacts with some cache that is expected to
@@ -62,6 +130,14 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
     auth tokens.
     """
 
+    shares_cache: bool = False
+    """
+    Whether flows with the same credentials and
+    scope share the default in-memory cache.
+    Otherwise, flows only share a cache when a
+    `client_userid` is given.
+    """
+
     @property
     def auth_config(self):
         return self.__auth_config__
@@ -70,14 +146,40 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
     def requests_config(self):
         return self.__requests_config__
 
+    @property
+    def normalized_scope(self) -> str:
+        """
+        The `auth_config` scope, normalized. Only
+        recomputed when the scope is reassigned.
+        """
+
+        scope  = self.auth_config.scope
+        cached = self._normalized_scope
+
+        if cached is None or cached[0] is not scope:
+            cached = (scope, tokens.normalize_scope(scope or ""))
+            self._normalized_scope = cached
+        return cached[1]
+
     __auth_config__:     configs.AuthConfig
     __requests_config__: configs.RequestsConfig
 
+    _normalized_scope: td.Optional[tuple[td.OptAuthScope, str]]
+
     def __enter__(self):
         return self
 
     def __exit__(self, etype, evalue, tback):
-        return
+        # The shared session is left open for
+        # other flows to reuse.
+        if self.session is not SHARED_SESSION:
+            self.session.close()
+
+        close = getattr(self.cache_manager, "close", None)
+        if close is not None:
+            close()
+
+        return False
 
     def __init__(self, client_id: str, client_secret: str,
         client_userid: td.OptString = None, *,
@@ -94,6 +196,7 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
         """Build some `OAuth2Flow` object."""
 
         # Initialize internal configs.
+        self._normalized_scope = None
         self._new_auth_config(
             client_id,
             client_secret,
@@ -128,10 +231,7 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
 
         args = args + (tokens.make_verifier(),)
 
-        inst = ft.generic_make(
-            configs.AuthConfig,
-            gt_args=args,
-            gt_kwds=kwds)
+        inst = configs.AuthConfig(*args, **kwds)
         inst.code_challenge = tokens.make_challenge(inst)
 
         self.__auth_config__ = inst
@@ -141,12 +241,46 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
         Creates a `CacheManager` object using
         this flows internal factory. The new
         manager is then assigned to this flow.
+
+        Flows using the default in-memory cache
+        share a manager per client credentials,
+        user and scope, so cached tokens outlive
+        any one flow. Tokens held for a user are
+        never shared between anonymous flows.
         """
 
-        inst = ft.generic_make(self.cache_class,
-            gt_factory=self.cache_factory,
-            gt_args=args,
-            gt_kwds=kwds)
+        userid = self.auth_config.client_userid
+        shared = (
+            not (args or kwds)
+            and self.cache_factory is None
+            and self.cache_class is cache.MemoryCacheManager
+            and (self.shares_cache or userid is not None))
+
+        if shared:
+            # Keyed on the secret too, so a wrong
+            # secret is never served tokens cached
+            # under the right one.
+            key  = (
+                tokens.make_authstring(self.auth_config),
+                userid,
+                self.normalized_scope)
+            with _CACHE_REGISTRY_LOCK:
+                inst = _CACHE_REGISTRY.get(key)
+                if inst is None:
+                    inst = _CACHE_REGISTRY[key] = self.cache_class()
+                _CACHE_REGISTRY.move_to_end(key)
+                while len(_CACHE_REGISTRY) > CACHE_REGISTRY_SIZE:
+                    _CACHE_REGISTRY.popitem(last=False)
+            self.cache_manager = inst
+            return
+
+        if self.cache_factory is None:
+            inst = self.cache_class(*args, **kwds)
+        else:
+            inst = ft.generic_make(self.cache_class,
+                gt_factory=self.cache_factory,
+                gt_args=args,
+                gt_kwds=kwds)
 
         self.cache_manager = inst
 
@@ -160,12 +294,12 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
 
         if not headers:
             headers = tokens.make_headers(self.auth_config)
-        args = (headers,) + args
 
-        inst = ft.generic_make(
-            configs.RequestsConfig,
-            gt_args=args,
-            gt_kwds=kwds)
+        # Wrapped once here so `requests` can
+        # merge them cheaply on every callout.
+        args = (CaseInsensitiveDict(headers),) + args
+
+        inst = configs.RequestsConfig(*args, **kwds)
 
         self.__requests_config__ = inst
 
@@ -174,8 +308,19 @@ class SimpleOAuth2Flow(pt.OAuth2Flow):
         Creates a `requests.Session` object using
         this flows internal factory. The new
         session is then assigned to this flow.
+
+        If no factory is defined, the
+        `SHARED_SESSION` is assigned instead.
         """
 
+        if self.session_factory is None:
+            if args or kwds:
+                inst = td.Session(*args, **kwds)
+            else:
+                inst = SHARED_SESSION
+            self.session = inst
+            return
+
         inst = ft.generic_make(td.Session,
             gt_factory=self.session_factory,
             gt_args=args,
@@ -5,11 +5,13 @@ import dataclasses
 from ampyr import protocols as pt, typedefs as td
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class SimpleConfig(pt.MetaConfig):
 
     def asdict(self):
-        return dataclasses.asdict(self)
+        # Fields are flat; skip the recursive
+        # copying done by `dataclasses.asdict`.
+        return {f: getattr(self, f) for f in self.__dataclass_fields__}
 
 
 @dataclasses.dataclass(slots=True)
@@ -16,14 +16,72 @@ using RESTful callouts.
 # requests to a target host.
 # --------------------------------------------- #
 
-import http, urllib.parse as urlparse
+import concurrent.futures, functools, logging, threading, types, weakref
+import urllib.parse as urlparse
 
 import requests
 
 from ampyr import errors, factories as ft, protocols as pt, typedefs as td
 from ampyr import cache
+from ampyr.cache import loaders
 from ampyr.oauth2 import base, configs, hosts, tokens
 
+_LOGGER = logging.getLogger(__name__)
+
+# Bound once at import so `_aquire_token`
+# avoids the enum attribute lookups.
+_TOKEN_ISVALID = tokens.TokenState.ISVALID
+_TOKEN_NEARLY_EXPIRED = tokens.TokenState.NEARLY_EXPIRED
+_TOKEN_EXPIRED = tokens.TokenState.EXPIRED
+_TOKEN_INVALID = tokens.TokenState.INVALID
+
+CLIENT_CREDENTIALS_PAYLOAD = types.MappingProxyType({
+    "grant_type": "client_credentials"})
+"""Token request payload for `CredentialsFlow`."""
+
+AUTHORIZATION_CODE_PAYLOAD = types.MappingProxyType({
+    "grant_type": "authorization_code"})
+"""
+Fixed fields of the token request payload for
+`AuthorizationFlow` and `PKCEFlow`.
+"""
+
+MAX_TOKEN_ATTEMPTS = 3
+"""
+Number of token requests `_aquire_token` makes
+before giving up on receiving a valid token.
+"""
+
+REFRESH_MAX_WORKERS = 2
+"""
+Number of threads used to refresh nearly expired
+tokens in the background.
+"""
+
+_REFRESH_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=REFRESH_MAX_WORKERS,
+    thread_name_prefix="ampyr-refresh")
+# Keyed by `_scoped_key`. Refreshes are removed
+# once they finish; locks are dropped once no
+# thread holds them.
+_REFRESHING: set[tuple[int, str]] = set()
+_REFRESHING_LOCK = threading.Lock()
+
+_TOKEN_LOCKS: weakref.WeakValueDictionary[tuple[int, str], threading.Lock] = (
+    weakref.WeakValueDictionary())
+_TOKEN_LOCKS_LOCK = threading.Lock()
+
+_TOKEN_LOADER: loaders.JSONLoader[td.TokenMetaData] = loaders.JSONLoader()
+
+
+def _client_credentials_factory():
+    """
+    Constructs the token request payload for
+    `CredentialsFlow`.
+    """
+
+    return td.TokenMetaData(CLIENT_CREDENTIALS_PAYLOAD) #type: ignore[misc]
+
 
 def _aquire_token(flow: base.SimpleOAuth2Flow, key: str, *,
     factory: ft.OptTokenMetaDataFT = None) -> td.TokenMetaData:
@@ -35,32 +93,194 @@ def _aquire_token(flow: base.SimpleOAuth2Flow, key: str, *,
     valid data exists.
     """
 
-    # Initial lookup for a token from the
+    scope = flow.normalized_scope
+
+    # Lookup for a token from the
     # `OAuth2Flow`'s cache manager.
-    data = flow.cache_manager.find(key)
+    data  = flow.cache_manager.find(key)
+    state = _validate_token(data, scope)
+    if state is _TOKEN_ISVALID:
+        return data #type: ignore[return-value]
+
+    # Nearly expired tokens are served without
+    # waiting on a refresh that may be running.
+    if state is _TOKEN_NEARLY_EXPIRED:
+        if "refresh_token" in data: #type: ignore[operator]
+            _schedule_refresh(flow, key, data) #type: ignore[arg-type]
+        return data #type: ignore[return-value]
+
+    # Only one caller per key requests a new
+    # token. Others wait, then read the token it
+    # cached.
+    with _get_token_lock(flow, key):
+        data = flow.cache_manager.find(key)
+        return _aquire_token_locked(flow, key, data, factory=factory)
+
+
+def _aquire_token_locked(flow: base.SimpleOAuth2Flow, key: str,
+    data: td.OptTokenMetaData, *,
+    factory: ft.OptTokenMetaDataFT = None) -> td.TokenMetaData:
+    """
+    Validates the given token data, requesting
+    new token data as needed. Expects the lock
+    for this key to be held.
+    """
 
-    # Validate the token data found.
-    scope = tokens.normalize_scope(flow.auth_config.scope or "")
-    state = tokens.validate(data, scope=scope)
+    scope = flow.normalized_scope
 
-    if state is tokens.TokenState.ISVALID and data:
-        return data
+    for _ in range(MAX_TOKEN_ATTEMPTS):
+        state = _validate_token(data, scope)
+
+        if state is _TOKEN_ISVALID:
+            return data #type: ignore[return-value]
+
+        refreshable = data is not None and "refresh_token" in data
+
+        # Serve the token while it is still
+        # good, refreshing it in the background.
+        if state is _TOKEN_NEARLY_EXPIRED:
+            if refreshable:
+                _schedule_refresh(flow, key, data) #type: ignore[arg-type]
+            return data #type: ignore[return-value]
+
+        previous = None
+        if state is _TOKEN_EXPIRED and refreshable:
+            payload, previous = _make_refresh_payload(data), data #type: ignore
+        elif factory:
+            payload = factory()
+
+        # Token either required a refresh or was
+        # invalid. Get new token data and
+        # validate it directly.
+        data = _request_token(flow, payload)
+        data = _save_token(flow, key, data, previous)
+
+        # A just-fetched token is served even if
+        # its lifetime falls within the expiry
+        # thresholds. Only an invalid token is
+        # requested again.
+        if _validate_token(data, scope) is not _TOKEN_INVALID:
+            return data #type: ignore[return-value]
+
+    raise errors.OAuth2Exception(
+        f"could not aquire a valid token after {MAX_TOKEN_ATTEMPTS} attempts.")
+
+
+def _validate_token(data: td.OptTokenMetaData, scope: str):
+    """
+    Determines the state of the given token. A
+    cache miss is invalid without further checks.
+    """
+
+    if data is None:
+        return _TOKEN_INVALID
+    return tokens.validate(data, scope=scope)
+
+
+def _scoped_key(flow: base.SimpleOAuth2Flow, key: str):
+    """
+    Qualifies a cache key with the cache manager
+    of the given flow. Flows using different
+    caches never share locks or refreshes.
+    """
+
+    return (id(flow.cache_manager), key)
+
+
+def _get_token_lock(flow: base.SimpleOAuth2Flow, key: str):
+    """
+    Returns the lock guarding token requests for
+    the given cache key. The lock is only kept
+    while it is referenced.
+    """
+
+    scoped = _scoped_key(flow, key)
+    lock   = _TOKEN_LOCKS.get(scoped)
+    if lock is None:
+        with _TOKEN_LOCKS_LOCK:
+            lock = _TOKEN_LOCKS.setdefault(scoped, threading.Lock())
+    return lock
+
+
+def _make_refresh_payload(data: td.TokenMetaData):
+    """
+    Constructs the token request payload used to
+    refresh the given token.
+    """
+
+    return td.TokenMetaData({
+        "refresh_token": data["refresh_token"],
+        "grant_type": "refresh_token"})
+
+
+def _save_token(flow: base.SimpleOAuth2Flow, key: str,
+    data: td.OptTokenMetaData, previous: td.OptTokenMetaData = None):
+    """
+    Caches newly requested token data. Fields
+    the server may leave out of a refresh
+    response are carried over.
+    """
+
+    if data:
+        if "scope" not in data:
+            data["scope"] = flow.normalized_scope
+        if previous and "refresh_token" not in data:
+            if "refresh_token" in previous:
+                data["refresh_token"] = previous["refresh_token"]
 
-    if state is tokens.TokenState.EXPIRED and data:
-        payload = td.TokenMetaData({
-            "refresh_token": data["refresh_token"],
-            "grant_type": "refresh_token"})
-    elif factory:
-        payload = factory()
-
-    # Token either required a refresh or was
-    # invalid. Get new token data and try again.
-    data = _request_token(flow, payload)
-    if data and "scope" not in data:
-        data["scope"] = scope
     flow.cache_manager.save(key, data) #type: ignore[arg-type]
+    return data
+
+
+def _schedule_refresh(
+    flow: base.SimpleOAuth2Flow, key: str, data: td.TokenMetaData):
+    """
+    Refreshes the given token in the background.
+    Only one refresh per key runs at a time.
+    """
+
+    scoped = _scoped_key(flow, key)
+    with _REFRESHING_LOCK:
+        if scoped in _REFRESHING:
+            return
+        _REFRESHING.add(scoped)
+
+    try:
+        _REFRESH_EXECUTOR.submit(_refresh_token, flow, key, data)
+    except RuntimeError:
+        # Executor was shut down at exit. The
+        # token is refreshed once it expires.
+        with _REFRESHING_LOCK:
+            _REFRESHING.discard(scoped)
 
-    return _aquire_token(flow, key, factory=factory)
+
+def _refresh_token(
+    flow: base.SimpleOAuth2Flow, key: str, data: td.TokenMetaData):
+    """
+    Requests and caches a refreshed token. If
+    this fails, the token is refreshed in the
+    foreground once it expires.
+    """
+
+    try:
+        # Hold the same lock as foreground
+        # requests, skipping the refresh if the
+        # cached token was replaced meanwhile.
+        with _get_token_lock(flow, key):
+            data = flow.cache_manager.find(key) #type: ignore[assignment]
+            state = _validate_token(data, flow.normalized_scope)
+            if state is not _TOKEN_NEARLY_EXPIRED:
+                return
+            if "refresh_token" not in data:
+                return
+
+            new = _request_token(flow, _make_refresh_payload(data))
+            _save_token(flow, key, new, data)
+    except Exception:
+        _LOGGER.exception("background refresh failed for %r", key)
+    finally:
+        with _REFRESHING_LOCK:
+            _REFRESHING.discard(_scoped_key(flow, key))
 
 
 def _request_token(flow: base.SimpleOAuth2Flow, payload: td.TokenMetaData):
@@ -83,7 +303,9 @@ def _request_token(flow: base.SimpleOAuth2Flow, payload: td.TokenMetaData):
     except requests.HTTPError as error:
         _handle_http_error(error)
     else:
-        data = td.TokenMetaData(response.json()) #type: ignore[misc]
+        # Decode the raw body directly; uses
+        # `orjson` when it is available.
+        data = loaders.load(_TOKEN_LOADER, response.content)
         tokens.set_expires(data)
         return data
 
@@ -91,7 +313,7 @@ def _request_token(flow: base.SimpleOAuth2Flow, payload: td.TokenMetaData):
 def _handle_http_error(error: requests.HTTPError):
     """Handle some HTTP exception."""
 
-    status = http.HTTPStatus(error.response.status_code)
+    status = error.response.status_code
     raise errors.OAuth2HttpError("something went wrong.", status=status)
 
 
@@ -102,39 +324,88 @@ def _make_search_key(config: configs.AuthConfig, default: td.OptString = None):
     """
 
     name = config.client_userid or default or "credentials"
-    return "{}[{}]".format(name, config.client_id)
+    return f"{name}[{config.client_id}]"
+
+
+def _join_query(baseurl: str, query: str):
+    """
+    Appends the given query string to the given
+    baseurl, extending any query it already has.
+    """
+
+    if not query:
+        return baseurl
+    return f"{baseurl}{'&' if '?' in baseurl else '?'}{query}"
+
+
+def _make_cached_param_url(flow: base.SimpleOAuth2Flow, payload: td.MetaData):
+    """
+    Returns the flow's oauth URL with the given
+    parameters joined to it. The last URL
+    rendered is reused if neither the URL nor
+    the parameters have changed.
+    """
+
+    baseurl = getattr(flow, "_url_for_oauth")
+    key     = (baseurl, *payload.items())
+
+    cached = getattr(flow, "_cached_oauth_url")
+    if cached and cached[0] == key:
+        return cached[1]
+
+    query = _encode_oauth_params(_normalize_payload(payload))
+    url   = _join_query(baseurl, query)
+    setattr(flow, "_cached_oauth_url", (key, url))
+    return url
+
+
+OAUTH_SAFE_PARAMS = frozenset((
+    "code_challenge",
+    "code_challenge_method",
+    "response_type",
+    "show_dialogue"))
+"""
+Names of oauth parameters whose values never
+need quoting.
+"""
 
 
-def _make_param_url(baseurl: str, payload: td.MetaData):
+def _encode_oauth_params(payload: td.MetaData):
     """
-    Returns the given baseurl with the given
-    parameters joined to it.
+    Renders the query string for an oauth URL.
+    Only values which may contain unsafe
+    characters are quoted.
     """
 
-    # Remove any null values.
-    payload = _normalize_payload(payload)
-    return "?".join([baseurl, urlparse.urlencode(payload)])
+    quote = urlparse.quote_plus
+    return "&".join([
+        f"{k}={v}" if k in OAUTH_SAFE_PARAMS else f"{k}={quote(str(v))}"
+        for k, v in payload.items()])
+
+
+@functools.lru_cache(maxsize=32)
+def _select_config_fields(keys: frozenset[str]):
+    """
+    Returns the names of `AuthConfig` fields
+    found in the given keys, in field order.
+    Results are memoized per set of keys.
+    """
+
+    return tuple(f for f in configs.AuthConfig.__dataclass_fields__ if f in keys)
 
 
 def _normalize_payload(payload: td.MetaData):
     """
     Filter out any fields in the payload that do
     not meet the condition. Condition is
-    "exclude objects that are not truthy".
+    "exclude values that are `None`". Falsy
+    values such as empty strings are kept.
 
     NOTE: This function returns a **copy** of the
     given payload, not the original modified.
     """
 
-    cleaned_data = payload.copy()
-    condition    = (lambda o: o != None)
-
-    for key, value in payload.items():
-        if condition(value):
-            continue
-        cleaned_data.pop(key)
-
-    return td.MetaData(cleaned_data)
+    return td.MetaData({k: v for k, v in payload.items() if v is not None})
 
 
 class NullFlow(base.SimpleOAuth2Flow):
@@ -146,6 +417,8 @@ class NullFlow(base.SimpleOAuth2Flow):
     returning empty or null data.
     """
 
+    __slots__ = ()
+
     def aquire(self):
         return td.NotAToken
 
@@ -163,10 +436,14 @@ class CredentialsFlow(base.SimpleOAuth2Flow):
     interaction.
     """
 
+    __slots__ = ()
+
+    shares_cache = True
+
     def aquire(self):
-        key     = _make_search_key(self.auth_config, "client_credentials")
-        factory = lambda: td.TokenMetaData({"grant_type": "client_credentials"})
-        return _aquire_token(self, key, factory=factory)["access_token"]
+        key = _make_search_key(self.auth_config, "client_credentials")
+        return _aquire_token(
+            self, key, factory=_client_credentials_factory)["access_token"]
 
 
 class AuthorizationFlow(base.SimpleOAuth2Flow):
@@ -181,15 +458,21 @@ class AuthorizationFlow(base.SimpleOAuth2Flow):
     interaction.
     """
 
-    oauth_param_keys: tuple[str, ...] = (
+    __slots__ = (
+        "oauth_code",
+        "show_dialogue",
+        "_url_for_oauth",
+        "_cached_oauth_url")
+
+    oauth_param_keys: frozenset[str] = frozenset((
         "client_id",
         "redirect_uri",
         "scope",
         "state",
         "show_dialogue",
-        "response_type")
+        "response_type"))
     """
-    Sequence of names expected to be used in an
+    Set of names expected to be used in an
     oauth token request.
     """
 
@@ -203,35 +486,48 @@ class AuthorizationFlow(base.SimpleOAuth2Flow):
 
     @property #type: ignore[override]
     def url_for_oauth(self):
-        params = {
-            k:v for k,v in self.auth_config.asdict().items()
-            if k in self.oauth_param_keys}
+        fields = _select_config_fields(self.oauth_param_keys)
+        params = {k:getattr(self.auth_config, k) for k in fields}
 
         params["redirect_uri"]  = self.auth_config.url_for_redirect
         params["show_dialogue"] = self.show_dialogue
         params["response_type"] = "code"
 
-        base = getattr(self, "_url_for_oauth")
-        return _make_param_url(base, params)
+        return _make_cached_param_url(self, params)
 
     @url_for_oauth.setter
     def url_for_oauth(self, value):
         setattr(self, "_url_for_oauth", value)
+        setattr(self, "_cached_oauth_url", None)
 
     def aquire(self):
         key = _make_search_key(self.auth_config, "authorization_code")
-
-        def factory():
-            if not self.oauth_code:
-                self.oauth_code = hosts.get_user_auth(self)
-            return _normalize_payload({
-                "redirect_uri": self.auth_config.url_for_redirect,
-                "grant_type": "authorization_code",
-                "code": self.oauth_code,
-                "scope": self.auth_config.scope,
-                "state": self.auth_config.state})
-
-        return _aquire_token(self, key, factory=factory)["access_token"]
+        return _aquire_token(
+            self, key, factory=self._make_token_payload)["access_token"]
+
+    def _make_token_payload(self):
+        """
+        Constructs the token request payload,
+        requesting user authorization first if
+        needed.
+        """
+
+        if not self.oauth_code:
+            self.oauth_code = hosts.get_user_auth(self)
+
+        payload = dict(AUTHORIZATION_CODE_PAYLOAD)
+        payload["redirect_uri"] = self.auth_config.url_for_redirect
+        payload["code"]         = self.oauth_code
+
+        # Only optional fields can be null. Set
+        # them directly instead of filtering the
+        # whole payload afterwards.
+        scope, state = self.auth_config.scope, self.auth_config.state
+        if scope is not None:
+            payload["scope"] = scope
+        if state is not None:
+            payload["state"] = state
+        return td.TokenMetaData(payload) #type: ignore[misc]
 
     def __init__(self, *args, show_dialogue: bool = False, **kwds):
         super().__init__(*args, **kwds)
@@ -254,16 +550,18 @@ class PKCEFlow(base.SimpleOAuth2Flow):
     mobile/desktop applications.
     """
 
-    oauth_param_keys: tuple[str, ...] = (
+    __slots__ = ("oauth_code", "_url_for_oauth", "_cached_oauth_url")
+
+    oauth_param_keys: frozenset[str] = frozenset((
         "client_id",
         "redirect_uri",
         "code_challenge",
         "scope",
         "state",
         "code_challenge_method",
-        "response_type")
+        "response_type"))
     """
-    Sequence of names expected to be used in an
+    Set of names expected to be used in an
     oauth token request.
     """
 
@@ -281,35 +579,41 @@ class PKCEFlow(base.SimpleOAuth2Flow):
 
     @property #type: ignore[override]
     def url_for_oauth(self):
-        params = {
-            k:v for k,v in self.auth_config.asdict().items()
-            if k in self.oauth_param_keys}
+        fields = _select_config_fields(self.oauth_param_keys)
+        params = {k:getattr(self.auth_config, k) for k in fields}
 
         params["redirect_uri"]          = self.auth_config.url_for_redirect
         params["response_type"]         = "code"
         params["code_challenge_method"] = self.oauth_challenge_method
 
-        base = getattr(self, "_url_for_oauth")
-        return _make_param_url(base, params)
+        return _make_cached_param_url(self, params)
 
     @url_for_oauth.setter
     def url_for_oauth(self, value):
         setattr(self, "_url_for_oauth", value)
+        setattr(self, "_cached_oauth_url", None)
 
     def aquire(self):
         key = _make_search_key(self.auth_config, "pkce")
-
-        def factory():
-            if not self.oauth_code:
-                self.oauth_code = hosts.get_user_auth(self)
-            return _normalize_payload({
-                "redirect_uri": self.auth_config.url_for_redirect,
-                "grant_type": "authorization_code",
-                "code": self.oauth_code,
-                "client_id": self.auth_config.client_id,
-                "code_verifier": self.auth_config.code_verifier})
-
-        return _aquire_token(self, key, factory=factory)["access_token"]
+        return _aquire_token(
+            self, key, factory=self._make_token_payload)["access_token"]
+
+    def _make_token_payload(self):
+        """
+        Constructs the token request payload,
+        requesting user authorization first if
+        needed.
+        """
+
+        if not self.oauth_code:
+            self.oauth_code = hosts.get_user_auth(self)
+
+        payload = dict(AUTHORIZATION_CODE_PAYLOAD)
+        payload["redirect_uri"]  = self.auth_config.url_for_redirect
+        payload["code"]          = self.oauth_code
+        payload["client_id"]     = self.auth_config.client_id
+        payload["code_verifier"] = self.auth_config.code_verifier
+        return _normalize_payload(payload)
 
     def __init__(self, *args, **kwds):
         super().__init__(*args, **kwds)
@@ -317,3 +621,31 @@ class PKCEFlow(base.SimpleOAuth2Flow):
         self.requests_config.headers.update({
             "Content-Type": "application/x-www-form-urlencoded"})
         self.oauth_code = None
+
+
+AQUIRE_MANY_MAX_WORKERS = 16
+"""
+Upper limit of threads used by `aquire_many` to
+request tokens concurrently.
+"""
+
+
+def aquire_many(pairs: td.Iterable[tuple[str, str]], **kwds) -> list[str]:
+    """
+    Aquires access tokens for a series of
+    client id and client secret pairs using the
+    `CredentialsFlow`. Requests are made
+    concurrently over the shared session.
+
+    Tokens are returned in the same order as
+    their pairs. Additional keyword arguments
+    are passed to each flow's constructor.
+    """
+
+    flows = [CredentialsFlow(cid, csecret, **kwds) for cid, csecret in pairs]
+    if not flows:
+        return []
+
+    workers = min(AQUIRE_MANY_MAX_WORKERS, len(flows))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda flow: flow.aquire(), flows))
@@ -14,7 +14,7 @@ approval.
 # purpose.
 # --------------------------------------------- #
 
-import pathlib, http, http.server, urllib.parse, webbrowser
+import pathlib, http, http.server, time, urllib.parse, webbrowser
 
 from ampyr import errors, typedefs as td
 from ampyr.oauth2 import base
@@ -46,12 +46,37 @@ SERVER_RESPONSE_HEADERS = [("Content-Type", "text-html")]
 SERVER_RESPONSE_ENCODING = "utf-8"
 """Use to encode incoming template data."""
 
+SERVER_TIMEOUT = 120.0
+"""
+Time in seconds the local server waits for the
+user to respond to the authorization request.
+"""
+
+SERVER_IGNORED_PATHS = ("/favicon",)
+"""
+Request paths answered with a 404 and otherwise
+ignored. Browsers request these alongside the
+redirect.
+"""
+
 SERVER_EXPECTED_FORMFIELDS = ("state", "code")
 """
 Series of fieldnames expected to be found in
 `AuthHTTPServer` response.
 """
 
+SERVER_RESPONSES = {
+    status: (path
+        .read_text()
+        .format(status=status)
+        .encode(SERVER_RESPONSE_ENCODING))
+    for status, path in SERVER_TEMPLATES.items()}
+"""
+Rendered and encoded `SERVER_TEMPLATES`. Loaded
+once so responses are written without touching
+the filesystem.
+"""
+
 
 def get_user_auth(flow: base.SimpleOAuth2Flow):
     """
@@ -72,8 +97,8 @@ def get_user_auth(flow: base.SimpleOAuth2Flow):
 def _get_host_info(flow: base.SimpleOAuth2Flow):
     """Returns the host and port information."""
 
-    result = urllib.parse.urlparse(flow.auth_config.url_for_redirect)
-    return result.scheme, result.netloc.split(":")[0], result.port
+    result = urllib.parse.urlsplit(flow.auth_config.url_for_redirect)
+    return result.scheme, result.hostname, result.port
 
 
 def _request_user_auth(flow: base.SimpleOAuth2Flow, port: int):
@@ -89,7 +114,16 @@ def _request_user_auth(flow: base.SimpleOAuth2Flow, port: int):
             f"{type(flow).__name__} missing oauth URL.")
 
     webbrowser.open(flow.url_for_oauth)
-    server.handle_request()
+
+    # Serve until the redirect arrives. Stray
+    # requests from the browser are skipped.
+    deadline = time.monotonic() + SERVER_TIMEOUT
+    with server:
+        while not (server.auth_code or server.error):
+            server.timeout = deadline - time.monotonic()
+            if server.timeout <= 0:
+                break
+            server.handle_request()
 
     if server.error:
         raise server.error
@@ -114,16 +148,7 @@ def _request_user_auth(flow: base.SimpleOAuth2Flow, port: int):
 def _open_auth_server(port: int):
     """Create a local HTTP server."""
 
-    server = LocalHTTPServer((LOCALHOST_ALIASES[0], port), LocalRequestHandler)
-
-    server.allow_reuse_address = True
-
-    server.auth_code       = None
-    server.auth_token_form = None
-    server.error           = None
-    server.state           = None
-
-    return server
+    return LocalHTTPServer((LOCALHOST_ALIASES[0], port), LocalRequestHandler)
 
 
 class LocalHTTPServer(http.server.HTTPServer):
@@ -133,6 +158,8 @@ class LocalHTTPServer(http.server.HTTPServer):
     user.
     """
 
+    allow_reuse_address = True
+
     auth_code: td.OptString
     """
     Code representing the state of authorization.
@@ -153,6 +180,14 @@ class LocalHTTPServer(http.server.HTTPServer):
     state: td.OptString
     """State of authorization."""
 
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+
+        self.auth_code       = None
+        self.auth_token_form = None
+        self.error           = None
+        self.state           = None
+
 
 class LocalRequestHandler(http.server.BaseHTTPRequestHandler):
     """
@@ -169,6 +204,10 @@ class LocalRequestHandler(http.server.BaseHTTPRequestHandler):
     """
 
     def do_GET(self):
+        if self.path.startswith(SERVER_IGNORED_PATHS):
+            self.send_error(404)
+            return
+
         _parse_server_response(self)
         self.send_response(200)
 
@@ -176,14 +215,11 @@ class LocalRequestHandler(http.server.BaseHTTPRequestHandler):
             self.send_header(key, value)
         self.end_headers()
 
-        status, message = "failure", "bad request."
-
-        if self.server.error:
-            message = f"failed {self.server.error!s}"
-        elif self.server.auth_code:
-            status, message = "success", "ok."
+        status = "failure"
+        if not self.server.error and self.server.auth_code:
+            status = "success"
 
-        _write_server_response(self, status, message)
+        _write_server_response(self, status)
 
     # Silence handler's log.
     def log_message(self, format: str, *args) -> None:
@@ -207,15 +243,10 @@ def _parse_server_response(handler: LocalRequestHandler):
     handler.server.state     = state
 
 
-def _write_server_response(
-    handler: LocalRequestHandler, status: str, message: str):
+def _write_server_response(handler: LocalRequestHandler, status: str):
     """
     Write to the target `LocalRequestHandler`'s
     stream.
     """
 
-    data = (SERVER_TEMPLATES[status]
-        .read_text()
-        .format(status=status)
-        .encode(SERVER_RESPONSE_ENCODING))
-    handler.wfile.write(data)
+    handler.wfile.write(SERVER_RESPONSES[status])
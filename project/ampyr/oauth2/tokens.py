@@ -10,7 +10,7 @@ Helper functions and utilities for token data.
 # tokens from local sources.
 # --------------------------------------------- #
 
-import base64, enum, hashlib, random, re, secrets, time, typing
+import base64, enum, functools, hashlib, secrets, time, types, typing
 
 from ampyr import typedefs as td
 from ampyr.oauth2 import configs
@@ -21,6 +21,20 @@ Amount of time in seconds allowed as a buffer
 between 'expired' and 'valid'.
 """
 
+REFRESH_THRESHOLD = EXPIRATION_THRESHOLD * 2
+"""
+Amount of time in seconds before 'expired' where
+a token is still served, but should be refreshed
+ahead of time.
+"""
+
+EXPIRATION_JITTER = 30
+"""
+Upper bound, in seconds, of the random amount
+taken off a token's lifetime. Spreads out the
+refreshes of tokens issued at the same time.
+"""
+
 CHALLENGE_ENCODING = "UTF-8"
 """
 Used to determine what encoding to use when
@@ -33,6 +47,13 @@ Used to encode, and then decode, the input values
 for generating the authentication string.
 """
 
+VERIFIER_NBYTES = 96
+"""
+Number of random bytes used for a code verifier.
+Encodes to 128 characters, the maximum length
+allowed by PKCE.
+"""
+
 
 class TokenState(enum.Enum):
     """
@@ -43,6 +64,12 @@ class TokenState(enum.Enum):
     ISVALID = enum.auto()
     """Token is good. No action required."""
 
+    NEARLY_EXPIRED = enum.auto()
+    """
+    Token is good, but will expire soon. Can be
+    used while a refresh happens.
+    """
+
     EXPIRED = enum.auto()
     """Token is bad. Needs to be refreshed."""
 
@@ -74,19 +101,34 @@ def validate(data: td.OptTokenMetaData, *, scope: td.OptString = None):
     if not scope_is_subset(scope, data_scope):
         return TokenState.INVALID
 
-    if isexpired(data):
+    remaining = data["expires_at"] - _now()
+
+    if remaining < EXPIRATION_THRESHOLD:
         return TokenState.EXPIRED
 
+    if remaining < REFRESH_THRESHOLD:
+        return TokenState.NEARLY_EXPIRED
+
     return TokenState.ISVALID
 
 
+def _now():
+    """
+    Current time in whole seconds since the
+    epoch. Avoids the float round trip through
+    `time.time`.
+    """
+
+    return time.time_ns() // 1_000_000_000
+
+
 def isexpired(data: td.TokenMetaData):
     """
     Determines whether or not the current token
     has expired yet or not.
     """
 
-    now = int(time.time())
+    now = _now()
     return (data["expires_at"] - now) < EXPIRATION_THRESHOLD
 
 
@@ -107,6 +149,11 @@ def set_expires(data: td.TokenMetaData, expires_at: td.Optional[int] = None):
     attempt to gain the expiration time from the
     token metadata; otherwise default assumption
     is in an hour from the current time.
+
+    Computed expiration times are brought
+    forward by up to `EXPIRATION_JITTER` seconds,
+    or a quarter of the token's lifetime if
+    that is shorter.
     """
 
     # If "expires_at" given, set the value as
@@ -115,17 +162,21 @@ def set_expires(data: td.TokenMetaData, expires_at: td.Optional[int] = None):
         data["expires_at"] = expires_at
         return
 
-    now = int(time.time())
-
     # Fist default. Set expire time to the passed
     # "expires_in" value after current time.
-    if hasattr(data, "expires_in"):
-        data["expires_at"] = now + data["expires_in"]
-        return
+    # Otherwise, set expire time to an hour after
+    # current time.
+    if "expires_in" in data:
+        expires_in = int(data["expires_in"])
+    else:
+        expires_in = 3600
 
-    # Final default. Set expire time to an hour
-    # after current time.
-    data["expires_at"] = now + 3600
+    # Jitter is kept to a fraction of short
+    # lifetimes.
+    jitter = min(EXPIRATION_JITTER, expires_in // 4)
+    if jitter > 0:
+        expires_in -= secrets.randbelow(jitter)
+    data["expires_at"] = _now() + expires_in
 
 
 def make_authstring(config: configs.AuthConfig):
@@ -134,11 +185,33 @@ def make_authstring(config: configs.AuthConfig):
     callouts.
     """
 
-    auth = (":".join([
-        config.client_id, config.client_secret])).encode(AUTH_ENCODING)
+    return _make_authstring(config.client_id, config.client_secret)
+
+
+@functools.lru_cache(maxsize=256)
+def _make_authstring(client_id: str, client_secret: str):
+    """
+    Renders the authentication string. Results
+    are memoized per set of credentials.
+    """
+
+    auth = f"{client_id}:{client_secret}".encode(AUTH_ENCODING)
     return f"Basic {base64.b64encode(auth).decode(AUTH_ENCODING)}"
 
 
+def reset_auth_material():
+    """
+    Clears memoized authentication strings and
+    headers.
+    """
+
+    _make_authstring.cache_clear()
+    _make_headers.cache_clear()
+
+
+_sha256 = hashlib.sha256
+
+
 def make_challenge(config: configs.AuthConfig):
     """
     Generates a url-safe, base64 encoded, number.
@@ -147,17 +220,30 @@ def make_challenge(config: configs.AuthConfig):
 
     verif = config.code_verifier
 
-    digest = hashlib.sha256(verif.encode(CHALLENGE_ENCODING))
-    rawb64 = base64.urlsafe_b64encode(digest.digest())
-    return rawb64.decode(CHALLENGE_ENCODING).replace("=", "")
+    digest = _sha256(verif.encode(CHALLENGE_ENCODING)).digest()
+    rawb64 = base64.urlsafe_b64encode(digest).rstrip(b"=")
+    return rawb64.decode(CHALLENGE_ENCODING)
 
 
 def make_headers(config: configs.AuthConfig):
     """
-    Generates a mapping of request headers.
+    Generates a mapping of request headers. The
+    mapping returned is read-only and shared
+    between calls for the same credentials.
+    """
+
+    return _make_headers(config.client_id, config.client_secret)
+
+
+@functools.lru_cache(maxsize=256)
+def _make_headers(client_id: str, client_secret: str):
+    """
+    Renders the request headers. Results are
+    memoized per set of credentials.
     """
 
-    return {"Authorization": make_authstring(config)}
+    authstring = _make_authstring(client_id, client_secret)
+    return types.MappingProxyType({"Authorization": authstring})
 
 
 def make_verifier():
@@ -166,7 +252,7 @@ def make_verifier():
     String is pseudo-random.
     """
 
-    return secrets.token_urlsafe(random.randint(33, 96))
+    return secrets.token_urlsafe(VERIFIER_NBYTES)
 
 
 # --------------------------------------------- #
@@ -181,10 +267,14 @@ def make_verifier():
 # consent before access is granted, or rejected.
 # --------------------------------------------- #
 
-# Identify values in a string separated either by
-# a single space or a comma.
-EXPECTED_SCOPE_FORMAT = re.compile(r"\w+[, ]{1}")
-"""Pattern dictating compound scope format."""
+def split_scope(scope: str):
+    """
+    Breaks a compound scope string into its
+    individual values. Values are expected to be
+    separated by spaces, commas, or both.
+    """
+
+    return scope.replace(",", " ").split()
 
 
 def normalize_scope(scope: td.AuthScope, *, join_char: td.OptString = None):
@@ -198,7 +288,7 @@ def normalize_scope(scope: td.AuthScope, *, join_char: td.OptString = None):
     """
 
     if isinstance(scope, str):
-        scope = EXPECTED_SCOPE_FORMAT.split(scope)
+        scope = split_scope(scope)
     return (join_char or " ").join(scope)
 
 
@@ -210,13 +300,9 @@ def scope_is_subset(first: td.OptString, second: td.OptString = None):
 
     # If either of the given values are `None`,
     # check to see if they both are.
-    if None in (first, second):
+    if first is None or second is None:
         return first == second
 
-    # Takes a string against the expected scope
-    # pattern and returns a set of it's values.
-    split = lambda scope: set(EXPECTED_SCOPE_FORMAT.split(scope))
-
-    first_set, second_set = [
-        split(i) for i in (first, second)]
-    return any([first_set <= second_set, second_set <= first_set])
+    first_set  = frozenset(split_scope(first))
+    second_set = frozenset(split_scope(second))
+    return first_set <= second_set or second_set <= first_set
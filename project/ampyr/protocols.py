@@ -16,6 +16,8 @@ class CacheManager(Protocol[td.GT]):
     expensive transactions.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def find(self, key: str) -> None | td.GT:
         """
@@ -31,6 +33,26 @@ class CacheManager(Protocol[td.GT]):
         assigning it to the given key.
         """
 
+    def find_many(self, keys: td.Iterable[str]) -> dict[str, None | td.GT]:
+        """
+        Attempt to retrieve data from the cache
+        for each of the given keys. Keys which
+        fail are mapped to `None`.
+        """
+
+        return {key: self.find(key) for key in keys}
+
+    def save_many(self, items: td.Mapping[str, td.GT]) -> td.Mapping[str, td.GT]:
+        """
+        Attempt to insert each of the given items
+        into the cache, assigning them to their
+        keys.
+        """
+
+        for key, data in items.items():
+            self.save(key, data)
+        return items
+
 
 class HasCacheHandler(Protocol):
     """
@@ -70,6 +92,8 @@ class MetaConfig(Protocol):
     for a specific purpose.
     """
 
+    __slots__ = ()
+
     def asdict(self) -> td.MetaData:
         """
         Breaks down this `MetaConfig` into
@@ -85,6 +109,8 @@ class OAuth2Flow(Protocol):
     token.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def aquire(self) -> td.CharToken:
         """Attempt to retrieve an auth token."""
@@ -119,6 +145,8 @@ class RESTDriver(Protocol):
     or constructing data payloads.
     """
 
+    __slots__ = ()
+
     def make_payload(self, data: td.OptRequestHeaders) -> td.RequestHeaders:
         """
         Properly constructs a mapping usable by
@@ -137,3 +165,5 @@ class RESTClient(Protocol):
     Broker object for making calls to the target
     RESTful `Web API`.
     """
+
+    __slots__ = ()
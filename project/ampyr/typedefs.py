@@ -3,13 +3,26 @@ Generic types used at the top level of this
 package.
 """
 
-import enum
 from os import PathLike
 from pathlib import Path
 from typing import NewType, TypedDict, TypeVar # Keep these separate.
-from typing import Any, Optional, Sequence
+from typing import Any, BinaryIO, Callable, Iterable, Mapping, Optional
+from typing import Final, Literal, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from requests import Session
+
+
+def __getattr__(name: str):
+    # Defer importing `requests` until `Session`
+    # is first used at runtime.
+    if name == "Session":
+        from requests import Session
+
+        globals()["Session"] = Session
+        return Session
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from requests import Session
 
 # --------------------------------------------- #
 # Generic Types.
@@ -33,17 +46,18 @@ OptionalGT = Optional[GT]
 # Numbers and Enums.
 # --------------------------------------------- #
 
-IntSuccess = 0
-IntFailure = 1
+IntSuccess: Final[int] = 0
+"""Integer value representing success."""
 
-class ReturnState(enum.IntEnum):
-    """
-    Integer values representing states of
-    success or failure.
-    """
+IntFailure: Final[int] = 1
+"""Integer value representing failure."""
 
-    SUCCESS = IntSuccess
-    FAILURE = IntFailure
+ReturnState = Literal[0, 1]
+"""
+Integer values representing states of
+success or failure. See `IntSuccess` and
+`IntFailure`.
+"""
 
 # --------------------------------------------- #
 # Strings and Bytes.
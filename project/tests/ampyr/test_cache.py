@@ -0,0 +1,280 @@
+import concurrent.futures, io, json, pathlib, secrets
+
+import pytest
+
+from ampyr.cache import loaders, managers
+
+
+class Clock:
+    """Stand-in for `time.monotonic`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch):
+    inst = Clock()
+    monkeypatch.setattr(managers.time, "monotonic", inst)
+    return inst
+
+
+def test_memory_round_trip():
+    manager = managers.MemoryCacheManager(serializer=loaders.JSONLoader())
+    data = {"a": 1}
+
+    assert manager.save("k", data) is data
+    assert manager.find("k") == data
+    assert manager.find("k") is not data
+    assert manager.find("missing") is None
+
+
+@pytest.mark.parametrize("kwds", [{}, {"lazy": True}])
+def test_memory_passthrough_shares_objects(kwds: dict):
+    manager = managers.MemoryCacheManager(**kwds)
+    data = {"a": 1}
+
+    manager.save("k", data)
+    assert manager.find("k") is data
+
+
+def test_class_level_serializer():
+    class Manager(managers.MemoryCacheManager):
+        __slots__ = ()
+        serializer = json
+
+    manager = Manager()
+    assert manager.serializer is json
+    assert Manager(serializer=loaders.JSONLoader()).serializer is not json
+
+    manager.save("k", {"a": 1})
+    assert manager.stored_data["k"] == '{"a": 1}'
+
+
+def test_memory_evicts_least_recently_used():
+    manager = managers.MemoryCacheManager(capacity=2)
+    manager.save("a", 1)
+    manager.save("b", 2)
+
+    # Touch "a" so "b" is evicted next.
+    assert manager.find("a") == 1
+    manager.save("c", 3)
+
+    assert manager.find("b") is None
+    assert manager.find("a") == 1
+    assert manager.find("c") == 3
+    assert len(manager.stored_data) == 2
+
+
+def test_memory_ttl_expires_records(clock: Clock):
+    manager = managers.MemoryCacheManager(ttl=10)
+    manager.save("k", 1)
+
+    clock.now = 9.5
+    assert manager.find("k") == 1
+
+    clock.now = 10
+    assert manager.find("k") is None
+    assert "k" not in manager.stored_data
+    assert "k" not in manager._expires_at
+
+
+def test_memory_ttl_reset_on_save(clock: Clock):
+    manager = managers.MemoryCacheManager(ttl=10)
+    manager.save("k", 1)
+
+    clock.now = 8
+    manager.save("k", 2)
+    clock.now = 15
+    assert manager.find("k") == 2
+
+
+def test_file_round_trip(tmp_path: pathlib.Path):
+    manager = managers.FileCacheManager(data_location=tmp_path / "cache")
+
+    assert manager.find("k") is None
+    manager.save("k", {"a": 1})
+    assert manager.find("k") == {"a": 1}
+
+
+@pytest.mark.parametrize("join_char", [":", "|", b"#"])
+def test_file_join_char(tmp_path: pathlib.Path, join_char):
+    class Manager(managers.FileCacheManager):
+        pass
+    Manager.join_char = join_char
+
+    manager = Manager(data_location=tmp_path / "cache")
+    manager.save("k", {"a": 1})
+    assert manager.find("k") == {"a": 1}
+
+
+@pytest.fixture
+def streamed(monkeypatch: pytest.MonkeyPatch):
+    """Records calls to `ijson.items`."""
+
+    if not loaders.ijson:
+        pytest.skip("ijson is not installed.")
+
+    calls = []
+    items = loaders.ijson.items
+
+    def spy(*args, **kwds):
+        calls.append(args)
+        return items(*args, **kwds)
+
+    monkeypatch.setattr(loaders.ijson, "items", spy)
+    return calls
+
+
+def test_file_streams_large_files(
+    tmp_path: pathlib.Path, streamed, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(loaders, "zstandard", None)
+
+    manager = managers.FileCacheManager(data_location=tmp_path / "cache")
+    data = {"items": [{"id": i, "value": 0.5} for i in range(8192)]}
+
+    manager.save("k", data)
+    size = pathlib.Path(manager.data_location).stat().st_size
+    assert size > manager.streaming_threshold
+
+    assert manager.find("other") is None
+    assert manager.find("k") == data
+    assert len(streamed) == 1
+
+
+def test_load_stream_without_ijson(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(loaders, "ijson", None)
+
+    stream = io.BytesIO(b'{"a": [1, 2.5]}')
+    assert loaders.load_stream(loaders.JSONLoader(), stream) == {"a": [1, 2.5]}
+
+
+def test_file_streams_compressed_records(tmp_path: pathlib.Path, streamed):
+    if not loaders.zstandard:
+        pytest.skip("zstandard is not installed.")
+
+    manager = managers.FileCacheManager(data_location=tmp_path / "cache")
+    data = {"items": [{"id": i, "name": "x" * 16} for i in range(32_768)]}
+
+    manager.save("k", data)
+    size = pathlib.Path(manager.data_location).stat().st_size
+    assert size < manager.streaming_threshold
+
+    assert manager.find("k") == data
+    assert len(streamed) == 1
+
+
+def test_file_streams_large_compressed_files(
+    tmp_path: pathlib.Path, streamed):
+    if not loaders.zstandard:
+        pytest.skip("zstandard is not installed.")
+
+    manager = managers.FileCacheManager(data_location=tmp_path / "cache")
+    data = [secrets.token_hex(16) for _ in range(8192)]
+
+    manager.save("k", data)
+    size = pathlib.Path(manager.data_location).stat().st_size
+    assert size > manager.streaming_threshold
+
+    assert manager.find("k") == data
+    assert manager.find("other") is None
+    assert len(streamed) == 1
+
+
+def test_file_removed_after_check(tmp_path: pathlib.Path):
+    manager = managers.FileCacheManager(data_location=tmp_path / "cache")
+    manager.save("k", {"a": 1})
+
+    pathlib.Path(manager.data_location).unlink()
+    assert manager.find("k") is None
+
+
+@pytest.fixture
+def shelf(tmp_path: pathlib.Path):
+    manager = managers.ShelfCacheManager(data_location=tmp_path / "shelf")
+    yield manager
+    manager.close()
+
+
+def test_shelf_round_trip(shelf: managers.ShelfCacheManager):
+    assert shelf.find("k") is None
+
+    shelf.save("k", {"a": 1})
+    assert shelf.find("k") == {"a": 1}
+
+    shelf.save("k", {"a": 2})
+    assert shelf.find("k") == {"a": 2}
+
+
+def test_shelf_persists(tmp_path: pathlib.Path):
+    manager = managers.ShelfCacheManager(data_location=tmp_path / "shelf")
+    manager.save("k", {"a": 1})
+    manager.close()
+
+    manager = managers.ShelfCacheManager(data_location=tmp_path / "shelf")
+    assert manager.find("k") == {"a": 1}
+    manager.close()
+
+
+def test_shelf_compresses_large_records(shelf: managers.ShelfCacheManager):
+    data = {"a": "x" * (loaders.COMPRESSION_THRESHOLD * 4)}
+
+    shelf.save("k", data)
+    assert shelf.find("k") == data
+
+
+def test_shelf_find_many(shelf: managers.ShelfCacheManager):
+    assert shelf.find_many([]) == {}
+    assert shelf.find_many(["a"]) == {"a": None}
+
+    items = {f"k{i}": {"i": i} for i in range(16)}
+    assert shelf.save_many(items) is items
+
+    found = shelf.find_many([*items, "missing"])
+    assert found.pop("missing") is None
+    assert found == items
+
+
+def test_shelf_find_many_chunks_keys(shelf: managers.ShelfCacheManager):
+    count = managers.SQLITE_MAX_VARIABLES * 2 + 1
+    items = {f"k{i}": i for i in range(count)}
+    shelf.save_many(items)
+
+    assert shelf.find_many(items) == items
+
+
+def test_shelf_save_many_is_atomic(shelf: managers.ShelfCacheManager):
+    class Unserializable:
+        pass
+
+    with pytest.raises(TypeError):
+        shelf.save_many({"a": 1, "b": Unserializable()})
+    assert shelf.find_many(["a", "b"]) == {"a": None, "b": None}
+
+
+def test_shelf_concurrent_writes(shelf: managers.ShelfCacheManager):
+    def write(idx: int):
+        if idx % 2:
+            shelf.save(f"single{idx}", idx)
+        else:
+            shelf.save_many({f"many{idx}-{i}": i for i in range(64)})
+
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        list(pool.map(write, range(256)))
+
+    for idx in range(256):
+        if idx % 2:
+            assert shelf.find(f"single{idx}") == idx
+        else:
+            keys = [f"many{idx}-{i}" for i in range(64)]
+            assert list(shelf.find_many(keys).values()) == list(range(64))
+
+
+def test_shelf_rejects_passthrough(tmp_path: pathlib.Path):
+    with pytest.raises(ValueError):
+        managers.ShelfCacheManager(
+            data_location=tmp_path / "shelf",
+            serializer=loaders.NullLoader())
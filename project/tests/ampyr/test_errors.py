@@ -0,0 +1,22 @@
+import http
+
+import pytest
+
+from ampyr import errors
+
+
+@pytest.mark.parametrize("status, expected", [
+    (404, http.HTTPStatus.NOT_FOUND),
+    (http.HTTPStatus.CONFLICT, http.HTTPStatus.CONFLICT),
+    (599, 599),
+])
+def test_http_error_status(status, expected):
+    error = errors.SpotifyHttpError("failed.", status=status)
+
+    assert error.status == expected
+    assert type(error.status) is type(expected)
+    assert str(error).startswith(f"{int(expected)}: ")
+
+
+def test_http_error_default_status():
+    assert errors.SpotifyHttpError().status is http.HTTPStatus(500)
@@ -0,0 +1,347 @@
+import concurrent.futures, json, logging, secrets, threading, time
+
+import pytest
+
+from ampyr import errors, oauth2
+from ampyr.oauth2 import base, flows, tokens
+
+
+class Response:
+    """Stand-in for `requests.Response`."""
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @property
+    def content(self):
+        return json.dumps(self.data).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+    """
+    Stand-in for `requests.Session`. Records the
+    payload of each token request.
+    """
+
+    def __init__(self, *, expires_in=3600, delay=0.0, fail=False):
+        self.calls = []
+        self.delay = delay
+        self.expires_in = expires_in
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def post(self, url, data=None, **kwds):
+        time.sleep(self.delay)
+        if self.fail:
+            raise errors.OAuth2Exception("token request failed.")
+
+        with self.lock:
+            self.calls.append(dict(data))
+            count = len(self.calls)
+        return Response({
+            "access_token": f"token{count}",
+            "expires_in": self.expires_in})
+
+    def close(self):
+        pass
+
+
+def make_flow(session: Session):
+    return oauth2.CredentialsFlow(
+        secrets.token_hex(8),
+        secrets.token_hex(8),
+        scope="a",
+        session_factory=lambda kwds: session)
+
+
+def search_key(flow: oauth2.CredentialsFlow):
+    return flows._make_search_key(flow.auth_config, "client_credentials")
+
+
+def wait_for_refresh(flow: oauth2.CredentialsFlow, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while flows._scoped_key(flow, search_key(flow)) in flows._REFRESHING:
+        assert time.monotonic() < deadline, "refresh did not finish."
+        time.sleep(0.01)
+
+
+def test_aquire_caches_token():
+    session = Session()
+    flow = make_flow(session)
+
+    assert flow.aquire() == "token1"
+    assert flow.aquire() == "token1"
+    assert len(session.calls) == 1
+
+
+def test_cache_shared_per_credentials():
+    client_id = secrets.token_hex(8)
+    first, second, other = (
+        oauth2.CredentialsFlow(client_id, secret, scope="a")
+        for secret in ("secret", "secret", "wrong"))
+
+    assert first.cache_manager is second.cache_manager
+    assert first.cache_manager is not other.cache_manager
+
+
+def test_cache_registry_is_bounded(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(base, "CACHE_REGISTRY_SIZE", 2)
+
+    first = make_flow(Session())
+    make_flow(Session())
+    make_flow(Session())
+
+    assert len(base._CACHE_REGISTRY) <= 2
+    assert first.cache_manager not in base._CACHE_REGISTRY.values()
+
+
+def test_user_flows_do_not_share_tokens():
+    session = Session()
+    client_id, client_secret = secrets.token_hex(8), secrets.token_hex(8)
+
+    found = []
+    for code in ("alice-code", "bob-code"):
+        flow = oauth2.AuthorizationFlow(
+            client_id,
+            client_secret,
+            scope="a",
+            session_factory=lambda kwds: session)
+        flow.oauth_code = code
+        found.append(flow.aquire())
+
+    assert found == ["token1", "token2"]
+    assert [call["code"] for call in session.calls] == [
+        "alice-code", "bob-code"]
+
+
+def test_user_flows_share_by_userid():
+    client_id, client_secret = secrets.token_hex(8), secrets.token_hex(8)
+    alice, alice2, bob = (
+        oauth2.AuthorizationFlow(client_id, client_secret, userid, scope="a")
+        for userid in ("alice", "alice", "bob"))
+
+    assert alice.cache_manager is alice2.cache_manager
+    assert alice.cache_manager is not bob.cache_manager
+
+
+def test_aquire_short_lived_token():
+    session = Session(expires_in=30)
+    flow = make_flow(session)
+
+    assert flow.aquire() == "token1"
+    assert len(session.calls) == 1
+
+
+def test_aquire_single_flight():
+    session = Session(delay=0.1)
+    flow = make_flow(session)
+
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        found = set(pool.map(lambda _: flow.aquire(), range(8)))
+
+    assert found == {"token1"}
+    assert len(session.calls) == 1
+
+
+def test_aquire_refreshes_expired_token():
+    session = Session()
+    flow = make_flow(session)
+    key = search_key(flow)
+    flow.aquire()
+
+    data = flow.cache_manager.find(key)
+    data["expires_at"] = tokens._now()
+    data["refresh_token"] = "R"
+    flow.cache_manager.save(key, data)
+
+    assert flow.aquire() == "token2"
+    assert session.calls[-1] == {
+        "refresh_token": "R", "grant_type": "refresh_token"}
+    assert flow.cache_manager.find(key)["refresh_token"] == "R"
+
+
+def test_aquire_refreshes_in_background():
+    session = Session()
+    flow = make_flow(session)
+    key = search_key(flow)
+    flow.aquire()
+
+    data = flow.cache_manager.find(key)
+    data["expires_at"] = tokens._now() + tokens.REFRESH_THRESHOLD - 10
+    data["refresh_token"] = "R"
+    flow.cache_manager.save(key, data)
+
+    # Nearly expired tokens are served while a
+    # refresh runs.
+    assert flow.aquire() == "token1"
+    wait_for_refresh(flow)
+
+    assert len(session.calls) == 2
+    assert session.calls[-1]["grant_type"] == "refresh_token"
+    assert flow.aquire() == "token2"
+
+
+def test_background_refresh_does_not_block():
+    session = Session()
+    flow = make_flow(session)
+    key = search_key(flow)
+    flow.aquire()
+
+    data = flow.cache_manager.find(key)
+    data["expires_at"] = tokens._now() + tokens.REFRESH_THRESHOLD - 10
+    data["refresh_token"] = "R"
+    flow.cache_manager.save(key, data)
+
+    # Callers are served the cached token while
+    # a slow refresh is in flight.
+    session.delay = 0.5
+    assert flow.aquire() == "token1"
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert flow.aquire() == "token1"
+    assert time.monotonic() - start < 0.1
+
+    wait_for_refresh(flow)
+    assert flow.aquire() == "token2"
+
+
+def test_background_refresh_skips_replaced_token():
+    session = Session()
+    flow = make_flow(session)
+    key = search_key(flow)
+    flow.aquire()
+
+    stale = flow.cache_manager.find(key)
+    stale["refresh_token"] = "R"
+
+    # The cached token is still valid, so no
+    # request is made.
+    flows._REFRESHING.add(flows._scoped_key(flow, key))
+    flows._refresh_token(flow, key, stale)
+
+    assert flows._scoped_key(flow, key) not in flows._REFRESHING
+    assert len(session.calls) == 1
+
+
+def test_background_refresh_logs_failure(caplog: pytest.LogCaptureFixture):
+    session = Session()
+    flow = make_flow(session)
+    key = search_key(flow)
+    flow.aquire()
+
+    data = flow.cache_manager.find(key)
+    data["expires_at"] = tokens._now() + tokens.REFRESH_THRESHOLD - 10
+    data["refresh_token"] = "R"
+    flow.cache_manager.save(key, data)
+
+    session.fail = True
+    with caplog.at_level(logging.ERROR, logger=flows.__name__):
+        flows._REFRESHING.add(flows._scoped_key(flow, key))
+        flows._refresh_token(flow, key, data)
+
+    assert flows._scoped_key(flow, key) not in flows._REFRESHING
+    assert "background refresh failed" in caplog.text
+    assert flow.aquire() == "token1"
+
+
+def test_encode_oauth_params():
+    query = flows._encode_oauth_params({
+        "client_id": "id",
+        "redirect_uri": "http://127.0.0.1:8080/cb",
+        "scope": "a b",
+        "state": "x&y",
+        "code_challenge": "abc-_",
+        "response_type": "code"})
+
+    assert query == (
+        "client_id=id"
+        "&redirect_uri=http%3A%2F%2F127.0.0.1%3A8080%2Fcb"
+        "&scope=a+b"
+        "&state=x%26y"
+        "&code_challenge=abc-_"
+        "&response_type=code")
+
+
+def test_aquire_many():
+    class EchoSession(Session):
+        """Issues each client its own authstring as a token."""
+
+        def post(self, url, data=None, headers=None, **kwds):
+            response = super().post(url, data=data, **kwds)
+            response.data["access_token"] = headers["Authorization"]
+            return response
+
+    session = EchoSession(delay=0.05)
+    pairs = [(secrets.token_hex(8), secrets.token_hex(8)) for _ in range(8)]
+
+    found = oauth2.aquire_many(pairs, session_factory=lambda kwds: session)
+    assert found == [
+        tokens._make_authstring(cid, csecret) for cid, csecret in pairs]
+    assert len(session.calls) == len(pairs)
+    assert oauth2.aquire_many([]) == []
+
+
+@pytest.mark.parametrize("baseurl, expected", [
+    ("https://host/authorize", "https://host/authorize?"),
+    ("https://host/authorize?x=1", "https://host/authorize?x=1&"),
+])
+def test_oauth_url_extends_query(baseurl, expected):
+    flow = oauth2.AuthorizationFlow(
+        "client", "secret", scope="a", url_for_oauth=baseurl)
+
+    assert flow.url_for_oauth.startswith(expected + "client_id=client&")
+    assert flow.url_for_oauth.count("?") == 1
+    assert flows._join_query(baseurl, "") == baseurl
+
+
+@pytest.mark.parametrize("cls", [oauth2.AuthorizationFlow, oauth2.PKCEFlow])
+def test_oauth_url_cached(cls):
+    flow = cls("client", "secret", scope="a b", state="s")
+
+    url = flow.url_for_oauth
+    assert "scope=a+b" in url and "state=s" in url
+    assert flow.url_for_oauth is url
+
+    # Changes to the config or the base URL
+    # render a new URL.
+    flow.auth_config.state = "t"
+    assert "state=t" in flow.url_for_oauth
+
+    flow.url_for_oauth = "https://host/authorize"
+    assert flow.url_for_oauth.startswith("https://host/authorize?")
+
+
+def test_oauth_url_honors_subclass_keys():
+    class Flow(oauth2.AuthorizationFlow):
+        oauth_param_keys = (
+            oauth2.AuthorizationFlow.oauth_param_keys - {"state"})
+
+    flow = Flow("client", "secret", scope="a", state="s")
+    assert "state=" not in flow.url_for_oauth
+    assert "client_id=client" in flow.url_for_oauth
+
+
+def test_token_locks_are_released():
+    session = Session()
+    flow = make_flow(session)
+    scoped = flows._scoped_key(flow, search_key(flow))
+
+    flow.aquire()
+    assert scoped not in flows._TOKEN_LOCKS
+    assert scoped not in flows._REFRESHING
+
+
+def test_token_locks_scoped_by_cache():
+    first, second = make_flow(Session()), make_flow(Session())
+    key = "shared-key"
+
+    assert first.cache_manager is not second.cache_manager
+    assert (flows._get_token_lock(first, key)
+        is not flows._get_token_lock(second, key))
+
+    lock = flows._get_token_lock(first, key)
+    assert flows._get_token_lock(first, key) is lock
@@ -0,0 +1,96 @@
+import socket, threading, urllib.error, urllib.request
+
+import pytest
+
+from ampyr import errors, oauth2
+from ampyr.oauth2 import hosts
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((hosts.LOCALHOST_ALIASES[0], 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+@pytest.fixture
+def browser(monkeypatch: pytest.MonkeyPatch):
+    """
+    Stands in for the user's browser. Requests
+    each path set on `paths` against the local
+    server once it is opened.
+    """
+
+    class Browser:
+        def __init__(self):
+            self.base = f"http://{hosts.LOCALHOST_ALIASES[0]}:{free_port()}"
+            self.paths: list[str] = []
+            self.statuses: list[int] = []
+            self.threads: list[threading.Thread] = []
+
+        def open(self, url: str):
+            def run():
+                for path in self.paths:
+                    self.statuses.append(get(f"{self.base}{path}"))
+
+            thread = threading.Thread(target=run)
+            thread.start()
+            self.threads.append(thread)
+
+        def join(self):
+            for thread in self.threads:
+                thread.join()
+
+    inst = Browser()
+    monkeypatch.setattr(hosts.webbrowser, "open", inst.open)
+    yield inst
+    inst.join()
+
+
+def make_flow(url_for_redirect: str):
+    return oauth2.AuthorizationFlow(
+        "client", "secret", scope="a", state="s",
+        url_for_redirect=url_for_redirect)
+
+
+def test_server_port_is_exclusive():
+    port = free_port()
+    with hosts._open_auth_server(port):
+        with pytest.raises(OSError):
+            hosts._open_auth_server(port)
+
+
+def test_user_auth_skips_favicon(browser):
+    browser.paths = ["/favicon.ico", "/?state=s&code=abc"]
+
+    assert hosts.get_user_auth(make_flow(browser.base)) == "abc"
+    browser.join()
+    assert browser.statuses == [404, 200]
+
+
+def test_user_auth_bad_state(browser):
+    browser.paths = ["/?state=other&code=abc"]
+
+    with pytest.raises(errors.OAuth2BadStateError):
+        hosts.get_user_auth(make_flow(browser.base))
+
+
+def test_user_auth_error(browser):
+    browser.paths = ["/?error=access_denied"]
+
+    with pytest.raises(errors.OAuth2HttpError):
+        hosts.get_user_auth(make_flow(browser.base))
+
+
+def test_user_auth_timeout(browser, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(hosts, "SERVER_TIMEOUT", 0.2)
+
+    with pytest.raises(errors.OAuth2HttpError):
+        hosts.get_user_auth(make_flow(browser.base))
@@ -0,0 +1,107 @@
+import base64, hashlib, re, types
+
+import pytest
+
+from ampyr.oauth2 import tokens
+
+NOW = 1_000_000
+
+
+@pytest.fixture
+def frozen(monkeypatch: pytest.MonkeyPatch):
+    """Fix the clock and remove expiry jitter."""
+
+    monkeypatch.setattr(tokens, "_now", lambda: NOW)
+    monkeypatch.setattr(tokens.secrets, "randbelow", lambda n: 0)
+
+
+def test_set_expires_uses_expires_in(frozen):
+    data = {"expires_in": 7200}
+    tokens.set_expires(data)
+    assert data["expires_at"] == NOW + 7200
+
+
+def test_set_expires_defaults_to_an_hour(frozen):
+    data = {}
+    tokens.set_expires(data)
+    assert data["expires_at"] == NOW + 3600
+
+
+def test_set_expires_given_value(frozen):
+    data = {"expires_in": 7200}
+    tokens.set_expires(data, NOW + 10)
+    assert data["expires_at"] == NOW + 10
+
+
+def test_set_expires_jitter_is_bounded(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(tokens, "_now", lambda: NOW)
+
+    for expires_in in (1, 4, 30, 7200):
+        for _ in range(64):
+            data = {"expires_in": expires_in}
+            tokens.set_expires(data)
+
+            jitter = min(tokens.EXPIRATION_JITTER, expires_in // 4)
+            assert NOW + expires_in - jitter <= data["expires_at"]
+            assert data["expires_at"] <= NOW + expires_in
+
+
+@pytest.mark.parametrize("remaining, state", [
+    (3600, tokens.TokenState.ISVALID),
+    (tokens.REFRESH_THRESHOLD - 1, tokens.TokenState.NEARLY_EXPIRED),
+    (tokens.EXPIRATION_THRESHOLD - 1, tokens.TokenState.EXPIRED),
+])
+def test_validate_by_remaining_time(frozen, remaining, state):
+    data = {"scope": "a b", "expires_at": NOW + remaining}
+    assert tokens.validate(data, scope="a") is state
+
+
+def test_validate_scope_mismatch(frozen):
+    data = {"scope": "a", "expires_at": NOW + 3600}
+    assert tokens.validate(data, scope="b") is tokens.TokenState.INVALID
+    assert tokens.validate(None) is tokens.TokenState.INVALID
+
+
+@pytest.mark.parametrize("scope, expected", [
+    ("a", ["a"]),
+    ("a b", ["a", "b"]),
+    ("a,b", ["a", "b"]),
+    ("a, b ,c", ["a", "b", "c"]),
+    ("user-read-private playlist-modify",
+        ["user-read-private", "playlist-modify"]),
+    ("", []),
+])
+def test_split_scope(scope, expected):
+    assert tokens.split_scope(scope) == expected
+
+
+def test_normalize_scope():
+    assert tokens.normalize_scope("a,b c") == "a b c"
+    assert tokens.normalize_scope(["a", "b"], join_char=",") == "a,b"
+
+
+def test_scope_is_subset():
+    assert tokens.scope_is_subset("a", "a b")
+    assert tokens.scope_is_subset("a b", "b")
+    assert not tokens.scope_is_subset("a c", "a b")
+    assert tokens.scope_is_subset(None, None)
+    assert not tokens.scope_is_subset("a", None)
+
+
+def test_make_verifier():
+    verifiers = {tokens.make_verifier() for _ in range(16)}
+
+    assert len(verifiers) == 16
+    for verifier in verifiers:
+        assert len(verifier) == 128
+        assert re.fullmatch(r"[A-Za-z0-9_-]+", verifier)
+
+
+def test_make_challenge():
+    verifier = tokens.make_verifier()
+    config = types.SimpleNamespace(code_verifier=verifier)
+
+    digest = hashlib.sha256(verifier.encode()).digest()
+    expected = base64.urlsafe_b64encode(digest).decode().rstrip("=")
+    assert tokens.make_challenge(config) == expected
+    assert len(expected) == 43